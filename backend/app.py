@@ -37,6 +37,22 @@ app.register_blueprint(chat_bp, url_prefix='/api/chat')
 app.register_blueprint(accommodations_bp, url_prefix='/api/accommodations')
 app.register_blueprint(community_bp, url_prefix='/api/community')
 
+# Bring the database file to the current schema before anything touches it
+from database.migrations import run_migrations
+run_migrations()
+
+# Background delivery of queued SMS/email
+from services.notification_outbox import start_dispatcher
+start_dispatcher()
+
+# Periodic downsampling and archiving of old location history
+from services.location_compaction import start_compaction_job
+start_compaction_job()
+
+# Background readiness probes read by /api/health
+from services.health_monitor import start_health_monitor
+start_health_monitor()
+
 # Health check endpoint
 @app.route('/')
 def index():
@@ -55,39 +71,35 @@ def index():
         }
     }), 200
 
+@app.route('/api/live')
+def liveness_check():
+    """Liveness probe: the process is up and serving (no database or network access)"""
+    return jsonify({'status': 'alive'}), 200
+
 @app.route('/api/health')
 def health_check():
-    """Detailed health check"""
-    import sqlite3
+    """
+    Readiness report from the last background probe run (see services.health_monitor)
     
-    # Check database
-    db_healthy = False
-    police_count = 0
-    hospital_count = 0
-    try:
-        conn = sqlite3.connect(app.config['DATABASE'])
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM police_stations")
-        police_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM hospitals")
-        hospital_count = cursor.fetchone()[0]
-        conn.close()
-        db_healthy = True
-    except Exception as e:
-        print(f"Database health check failed: {e}")
+    Returns 503 until the first probe run completes, when the database probe fails,
+    or when the snapshot is stale.
+    """
+    from services.health_monitor import get_snapshot
+    
+    snapshot = get_snapshot() or {'status': 'starting', 'checks': {}}
+    database = snapshot['checks'].get('database', {})
+    db_healthy = database.get('status') == 'ok'
     
     # Check AI service
     ai_healthy = bool(os.getenv('GEMINI_API_KEY'))
     
-    # Check Google Places
-    places_healthy = bool(os.getenv('GOOGLE_PLACES_API_KEY'))
-    
     return jsonify({
-        'status': 'healthy' if db_healthy else 'degraded',
+        **snapshot,
         'database': {
             'status': 'connected' if db_healthy else 'error',
-            'police_stations': f"{police_count} (Cached Fallback)",
-            'hospitals': f"{hospital_count} (Cached Fallback)",
+            'latency_ms': database.get('latency_ms'),
+            'police_stations': f"{database.get('police_stations', 0)} (Cached Fallback)",
+            'hospitals': f"{database.get('hospitals', 0)} (Cached Fallback)",
             'live_discovery': 'ACTIVE'
         },
         'services': {
@@ -98,6 +110,31 @@ def health_check():
             'twilio_sms': 'configured' if os.getenv('TWILIO_ACCOUNT_SID') else 'disabled',
             'sendgrid_email': 'configured' if os.getenv('SENDGRID_API_KEY') else 'disabled'
         }
+    }), 200 if snapshot['status'] in ('healthy', 'degraded') else 503
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Internal counters for scraping (cache hit/miss/eviction rates, coalesced lookups, connection reuse, write batching, outbox depth, stream subscribers, ingest buffer)"""
+    from services.ttl_cache import get_cache_stats
+    from services.single_flight import get_single_flight_stats
+    from services.http_client import get_http_stats
+    from services.notification_outbox import get_outbox_stats
+    from services.location_pubsub import get_pubsub_stats
+    from services.location_buffer import get_buffer_stats
+    from services.location_compaction import get_compaction_stats
+    from database.db import get_pool_stats
+    from database.writer import get_writer_stats
+    
+    return jsonify({
+        'caches': get_cache_stats(),
+        'single_flight': get_single_flight_stats(),
+        'http': get_http_stats(),
+        'outbox': get_outbox_stats(),
+        'pubsub': get_pubsub_stats(),
+        'location_buffer': get_buffer_stats(),
+        'compaction': get_compaction_stats(),
+        'db_pool': get_pool_stats(),
+        'db_writer': get_writer_stats()
     }), 200
 
 @app.route('/api/config')
@@ -127,48 +164,13 @@ def get_config():
 
 @app.route('/api/statistics')
 def get_statistics():
-    """Get platform statistics"""
-    import sqlite3
+    """Get platform statistics (trigger-maintained counters, cached for a few seconds)"""
+    from services.statistics import get_platform_statistics
     
     try:
-        conn = sqlite3.connect(app.config['DATABASE'])
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM sos_alerts")
-        total_sos = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM sos_alerts WHERE status = 'resolved'")
-        resolved_sos = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM police_stations")
-        police_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM hospitals")
-        hospital_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM safe_zones")
-        safe_zones_count = cursor.fetchone()[0]
-        
-        conn.close()
-        
         return jsonify({
             'success': True,
-            'statistics': {
-                'users': user_count,
-                'sos_alerts': {
-                    'total': total_sos,
-                    'resolved': resolved_sos,
-                    'active': total_sos - resolved_sos
-                },
-                'emergency_resources': {
-                    'police_stations': police_count,
-                    'hospitals': hospital_count,
-                    'safe_zones': safe_zones_count
-                }
-            }
+            'statistics': get_platform_statistics()
         }), 200
         
     except Exception as e:
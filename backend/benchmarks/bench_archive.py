@@ -0,0 +1,77 @@
+"""
+Archive Format Benchmark
+Bytes per fix for a day-long track: location_history rows, the original JSON+zlib
+archive and the columnar archive, plus the cost of a narrow time-range read
+Run from the backend folder: python -m benchmarks.bench_archive
+"""
+
+import json
+import math
+import time
+import uuid
+import zlib
+import random
+import sqlite3
+import timeit
+from datetime import datetime
+
+from services.location_archive import encode_track, iter_track
+
+FIXES = 17_280  # One fix every 5 seconds for 24 hours
+
+
+def make_track(n):
+    """A phone moving around Coimbatore with GPS jitter"""
+    rng = random.Random(7)
+    start = time.time() - 40 * 86400
+    lat, lng, heading = 11.0168, 76.9558, 0.0
+    rows = []
+    for i in range(n):
+        heading += rng.gauss(0, 0.1)
+        lat += math.cos(heading) * 0.00004 + rng.gauss(0, 0.000005)
+        lng += math.sin(heading) * 0.00004 + rng.gauss(0, 0.000005)
+        ts = start + i * 5 + rng.random() * 0.2
+        rows.append((str(uuid.uuid4()), 'user-123', lat, lng, round(rng.uniform(3, 20), 1), datetime.fromtimestamp(ts)))
+    return rows
+
+
+def sqlite_bytes(rows):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""
+        CREATE TABLE location_history (
+            id TEXT PRIMARY KEY, user_id TEXT NOT NULL, latitude REAL NOT NULL,
+            longitude REAL NOT NULL, accuracy REAL, created_at TIMESTAMP
+        )
+    """)
+    conn.executemany("INSERT INTO location_history VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return pages * page_size
+
+
+def main():
+    rows = make_track(FIXES)
+    timestamps_ms = [int(row[5].timestamp() * 1000) for row in rows]
+
+    json_payload = zlib.compress(json.dumps(
+        [[r[0], r[2], r[3], r[4], str(r[5])] for r in rows], separators=(',', ':')).encode('utf-8'))
+    columnar = encode_track(timestamps_ms, [r[2] for r in rows], [r[3] for r in rows], [r[4] for r in rows])
+
+    print(f"{FIXES} fixes (one user-day)")
+    for label, size in (('location_history rows (incl. PK index)', sqlite_bytes(rows)),
+                        ('json + zlib archive', len(json_payload)),
+                        ('columnar archive', len(columnar))):
+        print(f"  {label:<40} {size / FIXES:7.1f} bytes/fix")
+
+    # One hour out of the day
+    window = (timestamps_ms[FIXES // 2], timestamps_ms[FIXES // 2] + 3_600_000)
+    read = lambda offset, length: columnar[offset:offset + length]
+    full = timeit.timeit(lambda: list(iter_track(read)), number=5) / 5
+    ranged = timeit.timeit(lambda: list(iter_track(read, *window)), number=5) / 5
+    print(f"  full day decode   {full * 1000:7.2f} ms")
+    print(f"  one hour decode   {ranged * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
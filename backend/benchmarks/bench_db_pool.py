@@ -0,0 +1,97 @@
+"""
+Connection Pool Benchmark
+Requests per second on the hot read endpoints with the previous plain
+sqlite3.connect per call, tuned connections without pooling, and the pool
+Run from the backend folder: python -m benchmarks.bench_db_pool
+"""
+
+import os
+import sys
+import time
+import uuid
+import sqlite3
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+THREADS = 8
+REQUESTS_PER_THREAD = 250
+USER_ID = 'bench-user'
+
+ENDPOINTS = [
+    f'/api/sos/history/{USER_ID}',
+    f'/api/location/history/{USER_ID}?limit=50',
+    '/api/statistics',
+    '/api/health',
+]
+
+
+def legacy_connection(path):
+    """How get_db_connection opened connections before the pool"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def seed(db):
+    db.init_database()
+    conn = db.get_db_connection()
+    now = datetime.now()
+    conn.executemany(
+        "INSERT INTO location_history (id, user_id, latitude, longitude, accuracy, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(str(uuid.uuid4()), USER_ID, 13.0 + i * 1e-5, 80.2, 5, now - timedelta(seconds=i)) for i in range(5000)]
+    )
+    conn.executemany(
+        "INSERT INTO sos_alerts (id, user_id, latitude, longitude, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(str(uuid.uuid4()), USER_ID, 13.0, 80.2, 'resolved', now - timedelta(days=i)) for i in range(50)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(client):
+    def worker():
+        for i in range(REQUESTS_PER_THREAD):
+            client.get(ENDPOINTS[i % len(ENDPOINTS)])
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return THREADS * REQUESTS_PER_THREAD / (time.perf_counter() - started)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='bench_db_pool_')
+    os.chdir(workdir)
+
+    from database import db
+    db.DATABASE_PATH = os.path.join(workdir, 'bench.db')
+    with redirect_stdout(open(os.devnull, 'w')):
+        seed(db)
+        from app import app
+    client = app.test_client()
+
+    tuned_connection = db._open_connection
+    modes = [
+        ('plain connect per call (before)', legacy_connection, 0),
+        ('tuned connect per call', tuned_connection, 0),
+        (f'pooled ({db.DB_POOL_SIZE} idle)', tuned_connection, db.DB_POOL_SIZE),
+    ]
+
+    print(f"{THREADS} threads x {REQUESTS_PER_THREAD} requests over {len(ENDPOINTS)} read endpoints")
+    for label, opener, pool_size in modes:
+        db._open_connection = opener
+        db.DB_POOL_SIZE = pool_size
+        with redirect_stdout(open(os.devnull, 'w')):
+            run(client)  # warm up
+            rps = run(client)
+        print(f"  {label:<34} {rps:8.0f} req/s")
+    print(f"  pool stats: {db.get_pool_stats()}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
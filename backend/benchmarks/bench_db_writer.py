@@ -0,0 +1,97 @@
+"""
+Single Writer Benchmark
+Concurrent small writes (an SOS insert plus a like per request) with each
+thread opening its own connection and committing, versus queueing them on the
+writer thread and waiting for the batched commit
+Run from the backend folder: python -m benchmarks.bench_db_writer
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import numpy as np
+
+THREADS = 32
+WRITES_PER_THREAD = 100
+LEGACY_TIMEOUT_SECONDS = 1.0   # Short enough to surface 'database is locked' like busy production threads
+
+
+def sos_write(conn, user_id):
+    conn.execute(
+        "INSERT INTO sos_alerts (id, user_id, latitude, longitude, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (str(uuid.uuid4()), user_id, 13.0, 80.2, 'active', datetime.now())
+    )
+    conn.execute("UPDATE community_posts SET likes = likes + 1 WHERE id = 'bench-post'")
+
+
+def legacy_write(path, user_id):
+    """Per-request connection and commit, as the routes did before the writer"""
+    conn = sqlite3.connect(path, timeout=LEGACY_TIMEOUT_SECONDS)
+    try:
+        sos_write(conn, user_id)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run(write):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker(n):
+        for i in range(WRITES_PER_THREAD):
+            started = time.perf_counter()
+            try:
+                write(f'user-{n}')
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99), errors
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='bench_db_writer_')
+    from database import db
+    from database import writer
+    db.DATABASE_PATH = os.path.join(workdir, 'bench.db')
+    with redirect_stdout(open(os.devnull, 'w')):
+        db.init_database()
+    conn = db.get_db_connection()
+    conn.execute("INSERT INTO community_posts (id, user_id, title, content) VALUES ('bench-post', 'u', 't', 'c')")
+    conn.commit()
+    conn.close()
+
+    modes = [
+        ('connection + commit per request (before)', lambda user_id: legacy_write(db.DATABASE_PATH, user_id)),
+        ('single writer, waiting for commit', lambda user_id: writer.run_write(sos_write, user_id)),
+    ]
+
+    print(f"{THREADS} threads x {WRITES_PER_THREAD} writes (SOS insert + like)")
+    for label, write in modes:
+        rps, p50, p99, errors = run(write)
+        print(f"  {label:<42} {rps:7.0f} writes/s  p50 {p50:6.1f} ms  p99 {p99:7.1f} ms  errors {len(errors)}")
+        if errors:
+            print(f"    e.g. {errors[0]}")
+    print(f"  writer stats: {writer.get_writer_stats()}")
+
+
+if __name__ == '__main__':
+    main()
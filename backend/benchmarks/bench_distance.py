@@ -0,0 +1,70 @@
+"""
+Distance Benchmark
+Compares the scalar Haversine loop with the vectorized batch API
+Run from the backend folder: python -m benchmarks.bench_distance
+"""
+
+import random
+import timeit
+
+from services.location_service import (
+    calculate_distance, calculate_distances, get_nearest_locations
+)
+
+SIZES = [1_000, 10_000, 100_000]
+ORIGIN = (13.0827, 80.2707)  # Chennai Central
+TOP_K = 10
+
+
+def make_candidates(n):
+    """Random candidate locations spread over Tamil Nadu"""
+    rng = random.Random(42)
+    return [
+        {'id': i, 'latitude': rng.uniform(8.0, 13.5), 'longitude': rng.uniform(76.2, 80.4)}
+        for i in range(n)
+    ]
+
+
+def scalar_distances(locations):
+    return [calculate_distance(ORIGIN[0], ORIGIN[1], l['latitude'], l['longitude']) for l in locations]
+
+
+def scalar_nearest(locations):
+    """The previous get_nearest_locations: copy every candidate, sort all of them"""
+    results = []
+    for location in locations:
+        location_copy = location.copy()
+        location_copy['distance_km'] = round(calculate_distance(
+            ORIGIN[0], ORIGIN[1], location['latitude'], location['longitude']
+        ), 2)
+        results.append(location_copy)
+    results.sort(key=lambda x: x['distance_km'])
+    return results[:TOP_K]
+
+
+def best_of(fn, repeat=5):
+    number = 1
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main():
+    print(f"{'candidates':>10} | {'scalar dist':>12} | {'batch dist':>12} | {'speedup':>7} | "
+          f"{'scalar top-k':>12} | {'batch top-k':>12} | {'speedup':>7}")
+    print("-" * 92)
+
+    for n in SIZES:
+        locations = make_candidates(n)
+        lats = [l['latitude'] for l in locations]
+        lngs = [l['longitude'] for l in locations]
+
+        t_scalar = best_of(lambda: scalar_distances(locations))
+        t_batch = best_of(lambda: calculate_distances(ORIGIN[0], ORIGIN[1], lats, lngs))
+        t_scalar_k = best_of(lambda: scalar_nearest(locations))
+        t_batch_k = best_of(lambda: get_nearest_locations(ORIGIN[0], ORIGIN[1], locations, limit=TOP_K))
+
+        print(f"{n:>10,} | {t_scalar * 1000:>9.2f} ms | {t_batch * 1000:>9.2f} ms | {t_scalar / t_batch:>6.1f}x | "
+              f"{t_scalar_k * 1000:>9.2f} ms | {t_batch_k * 1000:>9.2f} ms | {t_scalar_k / t_batch_k:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
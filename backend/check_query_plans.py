@@ -0,0 +1,44 @@
+"""
+Query Plan Check
+Migrates a database and verifies every hot query is served by its index.
+Exits non-zero when a plan regresses (a table scan, a temp b-tree sort or a
+missing index), so it can gate schema and query changes.
+
+Usage: python check_query_plans.py [database_path]
+    Without a path a fresh temporary database is used; pass the production
+    file to check plans against its real statistics.
+"""
+
+import os
+import sys
+import tempfile
+
+from database import db
+from database.migrations import HOT_QUERIES, check_query_plans, run_migrations
+
+
+def main():
+    if len(sys.argv) > 1:
+        db.DATABASE_PATH = sys.argv[1]
+    else:
+        db.DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix='query_plans_'), 'check.db')
+
+    version = run_migrations()
+    conn = db.get_db_connection()
+    try:
+        failures = check_query_plans(conn)
+    finally:
+        conn.close()
+
+    print(f"📋 Schema version {version}, {len(HOT_QUERIES)} hot queries checked in {db.DATABASE_PATH}")
+    for failure in failures:
+        print(f"❌ {failure['query']}: expected {failure['expected_index']}")
+        for line in failure['plan']:
+            print(f"     {line}")
+    if failures:
+        sys.exit(1)
+    print("✅ All hot queries use their indexes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Session Store Check
+Runs the same get/set/update/TTL/delete checks against both session store
+backends. The Redis backend talks to a minimal in-process RESP server (just the
+commands RedisSessionStore uses), so no Redis install is needed; pass a URL to
+check against a real server instead. Exits non-zero on any failure.
+
+Usage: python check_session_store.py [redis_url]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import socketserver
+
+from services.session_store import RedisSessionStore, SQLiteSessionStore
+
+CONCURRENT_WRITERS = 4
+UPDATES_PER_WRITER = 25
+
+
+class _RespStandIn(socketserver.StreamRequestHandler):
+    """GET, SET [PX], DEL, PTTL, WATCH, UNWATCH, MULTI and EXEC over RESP2."""
+
+    data = {}
+    expires = {}
+    versions = {}        # Bumped on every write, for WATCH
+    lock = threading.Lock()
+
+    @classmethod
+    def _alive(cls, key) -> bool:
+        if key in cls.expires and cls.expires[key] <= time.time():
+            cls.data.pop(key, None)
+            cls.expires.pop(key, None)
+        return key in cls.data
+
+    @classmethod
+    def _write(cls, key, value=None, px=None):
+        if value is None:
+            cls.data.pop(key, None)
+        else:
+            cls.data[key] = value
+        cls.expires.pop(key, None)
+        if px is not None:
+            cls.expires[key] = time.time() + px / 1000
+        cls.versions[key] = cls.versions.get(key, 0) + 1
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _run(self, args) -> bytes:
+        command, key = args[0].upper(), args[1] if len(args) > 1 else None
+        if command == b'GET':
+            value = self.data.get(key) if self._alive(key) else None
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+        if command == b'SET':
+            px = int(args[4]) if len(args) > 4 and args[3].upper() == b'PX' else None
+            self._write(key, args[2], px)
+            return b'+OK\r\n'
+        if command == b'DEL':
+            existed = self._alive(key)
+            self._write(key)
+            return b':%d\r\n' % existed
+        if command == b'PTTL':
+            if not self._alive(key):
+                return b':-2\r\n'
+            if key not in self.expires:
+                return b':-1\r\n'
+            return b':%d\r\n' % int((self.expires[key] - time.time()) * 1000)
+        return b'-ERR unknown command\r\n'
+
+    def handle(self):
+        watched, queued = {}, None
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            with self.lock:
+                if command == b'MULTI':
+                    queued, reply = [], b'+OK\r\n'
+                elif command == b'EXEC':
+                    if any(self.versions.get(key, 0) != version for key, version in watched.items()):
+                        reply = b'*-1\r\n'
+                    else:
+                        replies = [self._run(queued_args) for queued_args in queued]
+                        reply = b'*%d\r\n' % len(replies) + b''.join(replies)
+                    watched, queued = {}, None
+                elif queued is not None:
+                    queued.append(args)
+                    reply = b'+QUEUED\r\n'
+                elif command == b'WATCH':
+                    watched.update({key: self.versions.get(key, 0) for key in args[1:]})
+                    reply = b'+OK\r\n'
+                elif command == b'UNWATCH':
+                    watched, reply = {}, b'+OK\r\n'
+                else:
+                    reply = self._run(args)
+            self.wfile.write(reply)
+
+
+class _ThreadedServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_resp_stand_in() -> str:
+    """Serve the RESP stand-in on a free local port; returns its redis:// URL"""
+    server = _ThreadedServer(('127.0.0.1', 0), _RespStandIn)
+    threading.Thread(target=server.serve_forever, name='resp-stand-in', daemon=True).start()
+    return f"redis://127.0.0.1:{server.server_address[1]}/0"
+
+
+def check_store(store) -> list:
+    """Run every check against a store; returns failure messages"""
+    failures = []
+
+    def expect(label, actual, expected):
+        if actual != expected:
+            failures.append(f"{label}: expected {expected!r}, got {actual!r}")
+
+    store.set('check', 'a', {'n': 0, 'status': 'active'}, ttl=60)
+    expect("get after set", store.get('check', 'a'), {'n': 0, 'status': 'active'})
+    expect("get of a missing key", store.get('check', 'missing'), None)
+    expect("update of a missing key", store.update('check', 'missing', lambda v: v.update(n=1)), None)
+
+    def increment(value):
+        value['n'] += 1
+
+    def writer():
+        for _ in range(UPDATES_PER_WRITER):
+            store.update('check', 'a', increment)
+
+    threads = [threading.Thread(target=writer) for _ in range(CONCURRENT_WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expect("concurrent updates", store.get('check', 'a'),
+           {'n': CONCURRENT_WRITERS * UPDATES_PER_WRITER, 'status': 'active'})
+
+    store.set('check', 'short', {'n': 1}, ttl=0.5)
+    store.update('check', 'short', increment)
+    expect("get before expiry", store.get('check', 'short'), {'n': 2})
+    time.sleep(0.7)
+    # update must keep the original expiry, not extend it
+    expect("get after expiry", store.get('check', 'short'), None)
+    expect("update after expiry", store.update('check', 'short', increment), None)
+
+    store.delete('check', 'a')
+    expect("get after delete", store.get('check', 'a'), None)
+    return failures
+
+
+def main():
+    redis_url = sys.argv[1] if len(sys.argv) > 1 else start_resp_stand_in()
+    sqlite_path = os.path.join(tempfile.mkdtemp(prefix='session_store_'), 'sessions.db')
+
+    failed = False
+    for name, store in (('sqlite', SQLiteSessionStore(sqlite_path)), (f'redis ({redis_url})', RedisSessionStore(redis_url))):
+        failures = check_store(store)
+        failed = failed or bool(failures)
+        print(f"{'❌' if failures else '✅'} {name}")
+        for failure in failures:
+            print(f"     {failure}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
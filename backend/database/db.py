@@ -3,159 +3,155 @@ Database Configuration
 SQLite database setup and initialization
 """
 
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
 DATABASE_PATH = 'safeher_travel.db'
 
-def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE_PATH)
+# Connection pool and per-connection tuning (DB_POOL_SIZE=0 opens a fresh connection per call)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))                      # Idle connections kept per database file
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', 5000))
+DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', 16384))          # Page cache per connection
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', 256 * 1024 * 1024))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 256))
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+# Pools inherited over fork: kept referenced so the child never closes (and checkpoints) the parent's handles
+_forked_pools = []
+_pool_stats = {'opened': 0, 'reused': 0, 'discarded': 0}
+_pool_stats_lock = threading.Lock()
+
+def _count(name):
+    with _pool_stats_lock:
+        _pool_stats[name] += 1
+
+def _open_connection(path):
+    """Open a connection with the pragmas every handler relies on"""
+    conn = sqlite3.connect(
+        path,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,  # Pooled connections move between threads (one at a time)
+        cached_statements=DB_STATEMENT_CACHE_SIZE
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute("PRAGMA recursive_triggers=ON")  # INSERT OR REPLACE deletions fire the counter triggers
+    _count('opened')
     return conn
 
-def init_database():
-    """Initialize database with all required tables"""
+class PooledConnection:
+    """
+    sqlite3 connection checked out of the pool. Behaves like the connection itself;
+    close() rolls back anything uncommitted and hands it back to the pool.
+    """
+    
+    def __init__(self, conn, path):
+        self._conn = conn
+        self._path = path
+        self._pid = os.getpid()
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def __enter__(self):
+        return self._conn.__enter__()
+    
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+    
+    def close(self):
+        conn, self._conn = self._conn, None
+        # Checked out before a fork: belongs to the parent, so neither pool nor close it here
+        if conn is not None and self._pid == os.getpid():
+            _release(conn, self._path)
+
+def _get_pool(path):
+    global _pools_pid
+    pool = _pools.get(path)
+    if pool is not None and _pools_pid == os.getpid():
+        return pool
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # SQLite connections must not cross fork; each worker process opens its own
+            _forked_pools.extend(_pools.values())
+            _pools.clear()
+            _pools_pid = os.getpid()
+        return _pools.setdefault(path, queue.LifoQueue())
+
+def _release(conn, path):
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        pool = _get_pool(path)
+        if pool.qsize() < DB_POOL_SIZE:
+            pool.put_nowait(conn)
+            return
+    except sqlite3.Error:
+        pass
+    _count('discarded')
+    conn.close()
+
+def get_db_connection():
+    """
+    Get database connection
+    
+    Connections come from a per-file pool (a new one is opened if all are busy)
+    and must be released with close().
+    """
+    path = DATABASE_PATH
+    if DB_POOL_SIZE <= 0:
+        return _open_connection(path)
+    try:
+        conn = _get_pool(path).get_nowait()
+        _count('reused')
+    except queue.Empty:
+        conn = _open_connection(path)
+    return PooledConnection(conn, path)
+
+@contextmanager
+def db_connection():
+    """
+    Connection for a with-block: commits on success, rolls back on error,
+    and is always released
+    
+    Usage:
+        with db_connection() as conn:
+            conn.execute(...)
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Emergency contacts
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS emergency_contacts (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            relationship TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # SOS alerts
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sos_alerts (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            status TEXT DEFAULT 'active',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            resolved_at TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Location history
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS location_history (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            accuracy REAL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Chat messages
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS chat_messages (
-            id TEXT PRIMARY KEY,
-            conversation_id TEXT NOT NULL,
-            user_id TEXT NOT NULL,
-            message TEXT NOT NULL,
-            sender TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Police stations
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS police_stations (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            address TEXT,
-            city TEXT,
-            district TEXT,
-            state TEXT DEFAULT 'Tamil Nadu',
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            phone TEXT,
-            station_type TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Hospitals
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS hospitals (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            address TEXT,
-            city TEXT,
-            district TEXT,
-            state TEXT DEFAULT 'Tamil Nadu',
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            phone TEXT,
-            emergency_phone TEXT,
-            hospital_type TEXT,
-            is_24x7 INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Safe zones
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS safe_zones (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            address TEXT,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            is_24x7 INTEGER DEFAULT 0,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Accommodations
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS accommodations (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            address TEXT,
-            city TEXT,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            phone TEXT,
-            rating REAL,
-            safety_rating REAL,
-            safety_verified INTEGER DEFAULT 0,
-            price_range TEXT,
-            amenities TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_pool_stats():
+    """Connections opened versus reused, and idle connections per database file"""
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    return dict(stats, idle={path: pool.qsize() for path, pool in list(_pools.items())})
+
+def init_database():
+    """Initialize database with all required tables (see database.migrations)"""
+    from database.migrations import run_migrations
     
-    conn.commit()
-    print("✓ Database tables created successfully")
+    conn = get_db_connection()
+    version = run_migrations(conn)
+    print(f"✓ Database tables created successfully (schema version {version})")
     
     # Seed Tamil Nadu data
     seed_tn_data(conn)
@@ -0,0 +1,415 @@
+"""
+Schema Migrations
+Versioned schema for the application database. PRAGMA user_version records the
+last migration applied; run_migrations() applies the rest in order, each in its
+own transaction, so any existing database file (created by init_database,
+setup_database.py or an older release) is brought to the current schema.
+
+Every migration is idempotent (IF NOT EXISTS / column checks) because files
+created before versioning start at user_version 0 with some tables present.
+"""
+
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from database.db import get_db_connection
+
+
+def _create_base_tables(conn):
+    """Tables created by init_database / setup_database.py before versioning"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS emergency_contacts (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            relationship TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sos_alerts (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            resolved_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS location_history (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            accuracy REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id TEXT PRIMARY KEY,
+            conversation_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            message TEXT NOT NULL,
+            sender TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS police_stations (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT,
+            city TEXT,
+            district TEXT,
+            state TEXT DEFAULT 'Tamil Nadu',
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            phone TEXT,
+            station_type TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS hospitals (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT,
+            city TEXT,
+            district TEXT,
+            state TEXT DEFAULT 'Tamil Nadu',
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            phone TEXT,
+            emergency_phone TEXT,
+            hospital_type TEXT,
+            is_24x7 INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS safe_zones (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            address TEXT,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            is_24x7 INTEGER DEFAULT 0,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS accommodations (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT,
+            city TEXT,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            phone TEXT,
+            rating REAL,
+            safety_rating REAL,
+            safety_verified INTEGER DEFAULT 0,
+            price_range TEXT,
+            amenities TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _add_account_and_community_tables(conn):
+    """Schema the user and community routes use but the original scripts never created"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+    if 'city' not in columns:
+        conn.execute("ALTER TABLE users ADD COLUMN city TEXT")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            token TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS community_posts (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            user_name TEXT,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            location_name TEXT,
+            category TEXT,
+            likes INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _add_hot_path_indexes(conn):
+    """Indexes for the per-user / per-conversation lookups ordered by time"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_location_history_user_created ON location_history (user_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sos_alerts_user_created ON sos_alerts (user_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_conversation_created ON chat_messages (conversation_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_emergency_contacts_user ON emergency_contacts (user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_user ON user_sessions (user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_community_posts_created ON community_posts (created_at)")
+
+
+def _add_service_tables(conn):
+    """Tables owned by background services (outbox, latest location, location archive)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id TEXT PRIMARY KEY,
+            idempotency_key TEXT UNIQUE NOT NULL,
+            channel TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            locked_by TEXT,
+            locked_until REAL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_outbox_due
+        ON notification_outbox (status, channel, next_attempt_at)
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_latest_location (
+            user_id TEXT PRIMARY KEY,
+            fix_id TEXT NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            accuracy REAL,
+            updated_at TIMESTAMP NOT NULL
+        )
+    """)
+    # Backfill users who only have history (rows already present are newer or equal)
+    conn.execute("""
+        INSERT OR IGNORE INTO user_latest_location (user_id, fix_id, latitude, longitude, accuracy, updated_at)
+        SELECT user_id, id, latitude, longitude, accuracy, created_at
+        FROM location_history h
+        WHERE created_at = (SELECT MAX(created_at) FROM location_history WHERE user_id = h.user_id)
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS location_archive (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            fix_count INTEGER NOT NULL,
+            start_ts REAL NOT NULL,
+            end_ts REAL NOT NULL,
+            encoding TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, day)
+        )
+    """)
+
+
+# Row counts maintained by triggers (counter name -> table); sos_alerts_resolved is kept separately
+COUNTED_TABLES = ('users', 'sos_alerts', 'police_stations', 'hospitals', 'safe_zones')
+
+
+def _add_table_counters(conn):
+    """Trigger-maintained row counts, so statistics never COUNT(*) a growing table"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in COUNTED_TABLES:
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table}
+            BEGIN UPDATE table_counters SET value = value + 1 WHERE name = '{table}'; END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table}
+            BEGIN UPDATE table_counters SET value = value - 1 WHERE name = '{table}'; END
+        """)
+        # Seeded in the same transaction as the triggers, so no write is missed or double counted
+        conn.execute(f"INSERT OR REPLACE INTO table_counters (name, value) SELECT '{table}', COUNT(*) FROM {table}")
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sos_alerts_resolved_insert AFTER INSERT ON sos_alerts
+        WHEN NEW.status IS 'resolved'
+        BEGIN UPDATE table_counters SET value = value + 1 WHERE name = 'sos_alerts_resolved'; END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sos_alerts_resolved_delete AFTER DELETE ON sos_alerts
+        WHEN OLD.status IS 'resolved'
+        BEGIN UPDATE table_counters SET value = value - 1 WHERE name = 'sos_alerts_resolved'; END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sos_alerts_resolved_update AFTER UPDATE OF status ON sos_alerts
+        WHEN (OLD.status IS 'resolved') IS NOT (NEW.status IS 'resolved')
+        BEGIN
+            UPDATE table_counters
+            SET value = value + (CASE WHEN NEW.status IS 'resolved' THEN 1 ELSE -1 END)
+            WHERE name = 'sos_alerts_resolved';
+        END
+    """)
+    conn.execute("""
+        INSERT OR REPLACE INTO table_counters (name, value)
+        SELECT 'sos_alerts_resolved', COUNT(*) FROM sos_alerts WHERE status = 'resolved'
+    """)
+
+
+# (version, description, apply) in order; append only, never edit a released entry
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'base tables', _create_base_tables),
+    (2, 'users.city, user_sessions, community_posts', _add_account_and_community_tables),
+    (3, 'hot path indexes', _add_hot_path_indexes),
+    (4, 'service tables: outbox, latest location, archive', _add_service_tables),
+    (5, 'trigger-maintained table counters', _add_table_counters),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Queries on request paths that must be served by an index: (name, sql, params, index)
+HOT_QUERIES = [
+    ('location history (recent)',
+     "SELECT * FROM location_history WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+     ('u', 100), 'idx_location_history_user_created'),
+    ('location history (time range)',
+     "SELECT * FROM location_history WHERE user_id = ? AND created_at >= ? AND created_at <= ? "
+     "ORDER BY created_at DESC LIMIT ?",
+     ('u', '2024-01-01', '2024-01-02', 100), 'idx_location_history_user_created'),
+    ('location compaction (user-day)',
+     "SELECT * FROM location_history WHERE user_id = ? AND created_at >= ? AND created_at < ? ORDER BY created_at",
+     ('u', '2024-01-01', '2024-01-02'), 'idx_location_history_user_created'),
+    ('sos history',
+     "SELECT * FROM sos_alerts WHERE user_id = ? ORDER BY created_at DESC LIMIT 50",
+     ('u',), 'idx_sos_alerts_user_created'),
+    ('chat conversation',
+     "SELECT * FROM chat_messages WHERE conversation_id = ? ORDER BY created_at ASC",
+     ('c',), 'idx_chat_messages_conversation_created'),
+    ('emergency contacts',
+     "SELECT phone FROM emergency_contacts WHERE user_id = ?",
+     ('u',), 'idx_emergency_contacts_user'),
+    ('community feed',
+     "SELECT * FROM community_posts ORDER BY created_at DESC LIMIT 50",
+     (), 'idx_community_posts_created'),
+]
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn=None) -> int:
+    """
+    Apply pending migrations
+
+    Each migration runs under BEGIN IMMEDIATE and re-checks user_version once the
+    write lock is held, so processes starting together apply each step once.
+
+    Args:
+        conn: Open connection with no transaction in progress (default: a pooled one)
+
+    Returns:
+        int: Schema version after migrating
+    """
+    own_connection = conn is None
+    if own_connection:
+        conn = get_db_connection()
+    try:
+        for version, description, apply in MIGRATIONS:
+            if get_schema_version(conn) >= version:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if get_schema_version(conn) < version:
+                    apply(conn)
+                    conn.execute(f"PRAGMA user_version = {int(version)}")
+                    print(f"[MIGRATIONS] Applied {version}: {description}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return get_schema_version(conn)
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def ensure_schema():
+    """
+    Run migrations once per process, on a connection of its own
+
+    Services call it so background jobs and scripts work against a database
+    file the app has not migrated yet; it never touches the caller's transaction.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            run_migrations()
+            _schema_ready = True
+
+
+def explain(conn, sql: str, params=()) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines for a statement"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def check_query_plans(conn) -> List[Dict]:
+    """
+    Check that every HOT_QUERIES statement is served by its index
+
+    A plan fails if it does not use the expected index, scans where it should
+    search, or sorts in a temporary b-tree.
+
+    Returns:
+        list: One entry per failing query (name, expected index, plan); empty when all pass
+    """
+    failures = []
+    for name, sql, params, index in HOT_QUERIES:
+        plan = explain(conn, sql, params)
+        uses_index = any(index in line for line in plan)
+        # Lookups must SEARCH; only unfiltered feeds may walk an index in order
+        scans = any(line.startswith('SCAN') and ('USING' not in line or ' WHERE ' in sql) for line in plan)
+        sorts = any('TEMP B-TREE' in line for line in plan)
+        if not uses_index or scans or sorts:
+            failures.append({'query': name, 'expected_index': index, 'plan': plan})
+    return failures
+
+
+if __name__ == '__main__':
+    import sys
+    from database import db
+
+    if len(sys.argv) > 1:
+        db.DATABASE_PATH = sys.argv[1]
+    print(f"Schema version: {run_migrations()} (latest {SCHEMA_VERSION}) in {db.DATABASE_PATH}")
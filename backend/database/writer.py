@@ -0,0 +1,189 @@
+"""
+Database Writer
+One writer thread per database file owns the write connection. Request
+threads queue write operations; the writer applies them in small batched
+transactions, so threads in a process never contend for SQLite's write lock
+and a burst of writes costs one commit instead of one each.
+
+An operation is a function taking the writer's connection (plus arguments).
+It runs inside the batch transaction under its own savepoint, so a failing
+operation is rolled back alone. Operations must not commit, begin transactions
+or queue further writes themselves.
+
+    run_write(op, ...)     waits for the commit; for writes the response depends on
+                           (the SOS insert, registrations, anything returning a count)
+    submit_write(op, ...)  returns a Future at once; failures are logged
+
+Reads stay on pooled connections (database.db.get_db_connection).
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from database import db
+
+WRITER_BATCH_MAX = int(os.getenv('DB_WRITER_BATCH_MAX', 64))                  # Operations per transaction
+WRITER_QUEUE_CAPACITY = int(os.getenv('DB_WRITER_QUEUE_CAPACITY', 10000))    # Submitters block when full
+WRITER_TIMEOUT_SECONDS = float(os.getenv('DB_WRITER_TIMEOUT_SECONDS', 30))   # run_write wait limit
+
+
+class DBWriter:
+    """Writer thread and queue for one database file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue = queue.Queue(maxsize=WRITER_QUEUE_CAPACITY)
+        self._stats = {'operations': 0, 'failed_operations': 0, 'batches': 0,
+                       'failed_batches': 0, 'max_batch': 0, 'last_batch_ms': 0.0}
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, operation: Callable, *args) -> Future:
+        """Queue operation(conn, *args); the Future resolves to its return value after commit"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Write operations cannot queue further writes")
+        future = Future()
+        self._queue.put((operation, args, future))
+        return future
+
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITER_BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None:
+                    conn = db._open_connection(self.path)
+                self._apply(conn, batch)
+            except Exception as e:
+                # Connection-level failure: fail the batch and reopen for the next one
+                print(f"[DB WRITER] Batch of {len(batch)} failed: {e}")
+                self._stats['failed_batches'] += 1
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+
+    def _apply(self, conn, batch):
+        started = time.perf_counter()
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        outcomes = []
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for operation, args, future in batch:
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    outcomes.append((future, operation(conn, *args), None))
+                    conn.execute("RELEASE write_op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    outcomes.append((future, None, e))
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                self._stats['failed_operations'] += 1
+                future.set_exception(error)
+        self._stats['operations'] += len(batch)
+        self._stats['batches'] += 1
+        self._stats['max_batch'] = max(self._stats['max_batch'], len(batch))
+        self._stats['last_batch_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    def stats(self) -> Dict:
+        return dict(self._stats, queued=self._queue.qsize())
+
+
+_writers: Dict[str, DBWriter] = {}
+_writers_pid = None
+_writers_lock = threading.Lock()
+
+
+def get_writer(path: Optional[str] = None) -> DBWriter:
+    """Writer for a database file (default: database.db.DATABASE_PATH), started on first use"""
+    global _writers_pid
+    path = path or db.DATABASE_PATH
+    writer = _writers.get(path)
+    if writer is not None and _writers_pid == os.getpid():
+        return writer
+    with _writers_lock:
+        if _writers_pid != os.getpid():
+            # Threads do not survive fork; each worker process gets its own writers
+            _writers.clear()
+            _writers_pid = os.getpid()
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = DBWriter(path)
+        return writer
+
+
+def _log_failure(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"[DB WRITER] Write failed: {future.exception()}")
+
+
+def submit_write(operation: Callable, *args) -> Future:
+    """
+    Queue a write without waiting for it
+
+    Args:
+        operation: Called as operation(conn, *args) inside the writer's transaction
+
+    Returns:
+        Future: Resolves to the operation's return value once committed
+    """
+    future = get_writer().submit(operation, *args)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def run_write(operation: Callable, *args, timeout: Optional[float] = WRITER_TIMEOUT_SECONDS):
+    """
+    Queue a write and wait until it is committed
+
+    Returns:
+        The operation's return value
+
+    Raises:
+        The operation's exception, or TimeoutError if the writer is backed up.
+        A timed-out operation that has not started is cancelled, so it never
+        commits behind the caller's back (one already running still commits).
+    """
+    future = get_writer().submit(operation, *args)
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def execute_write(sql: str, params=()):
+    """Single statement for run_write / submit_write; returns the cursor's rowcount"""
+    def operation(conn):
+        return conn.execute(sql, params).rowcount
+    return operation
+
+
+def get_writer_stats() -> Dict:
+    """Operations, batches and queue depth per database file"""
+    return {path: writer.stats() for path, writer in list(_writers.items())}
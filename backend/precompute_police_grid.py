@@ -0,0 +1,38 @@
+"""
+Police Grid Precompute Script
+Builds the nearest-police lookup grid from the police_stations reference table.
+Re-run after reloading reference data: python precompute_police_grid.py [output_path]
+"""
+
+import sys
+
+from database.db import get_db_connection
+from services.police_grid import build_police_grid, POLICE_GRID_PATH, GRID_STEP_DEG, GRID_K
+
+
+def load_stations():
+    """Load every police station from the reference table"""
+    conn = get_db_connection()
+    rows = conn.execute("SELECT * FROM police_stations").fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else POLICE_GRID_PATH
+
+    stations = load_stations()
+    if not stations:
+        print("❌ No police stations found. Run setup_database.py first.")
+        sys.exit(1)
+
+    print(f"📍 Precomputing {GRID_K} nearest of {len(stations)} police stations on a {GRID_STEP_DEG}° grid...")
+    summary = build_police_grid(stations, path)
+
+    print(f"✅ Wrote {path}: {summary['cells']} cells, {summary['bytes'] / 1024:.0f} KB")
+    print(f"   Nearest station distance: median {summary['nearest_km_p50']:.1f} km, "
+          f"worst {summary['nearest_km_max']:.1f} km")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,10 +7,16 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 from services.enhanced_ai_service import get_ai_response
 from database.db import get_db_connection
+from database.writer import execute_write, submit_write
 import uuid
 
 chat_bp = Blueprint('chat', __name__)
 
+INSERT_MESSAGE_SQL = """
+    INSERT INTO chat_messages (id, conversation_id, user_id, message, sender, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
 @chat_bp.route('/message', methods=['POST'])
 def send_message():
     """
@@ -29,25 +35,18 @@ def send_message():
         conversation_id = data.get('conversation_id', str(uuid.uuid4()))
         user_location = data.get('user_location')  # NEW: Get user location
         
-        # Save user message
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO chat_messages (id, conversation_id, user_id, message, sender, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (str(uuid.uuid4()), conversation_id, user_id, message, 'user', datetime.now()))
-        conn.commit()
+        # Save user message (queued; the writer keeps both messages in order)
+        submit_write(execute_write(INSERT_MESSAGE_SQL, (
+            str(uuid.uuid4()), conversation_id, user_id, message, 'user', datetime.now()
+        )))
         
         # Get AI response with location context
         ai_response = get_ai_response(message, conversation_id, user_location)
         
         # Save AI response
-        cursor.execute("""
-            INSERT INTO chat_messages (id, conversation_id, user_id, message, sender, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (str(uuid.uuid4()), conversation_id, user_id, ai_response, 'assistant', datetime.now()))
-        conn.commit()
-        conn.close()
+        submit_write(execute_write(INSERT_MESSAGE_SQL, (
+            str(uuid.uuid4()), conversation_id, user_id, ai_response, 'assistant', datetime.now()
+        )))
         
         return jsonify({
             'success': True,
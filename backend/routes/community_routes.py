@@ -7,6 +7,7 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 import uuid
 from database.db import get_db_connection
+from database.writer import execute_write, run_write
 
 community_bp = Blueprint('community', __name__)
 
@@ -44,14 +45,10 @@ def create_post():
             return jsonify({'success': False, 'error': 'Title and content are required'}), 400
 
         post_id = str(uuid.uuid4())
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        run_write(execute_write("""
             INSERT INTO community_posts (id, user_id, user_name, title, content, location_name, category, likes, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)
-        """, (post_id, user_id, user_name, title, content, location_name, category, datetime.now()))
-        conn.commit()
-        conn.close()
+        """, (post_id, user_id, user_name, title, content, location_name, category, datetime.now())))
 
         return jsonify({'success': True, 'post_id': post_id, 'message': 'Post created successfully'}), 201
     except Exception as e:
@@ -62,15 +59,15 @@ def create_post():
 def like_post(post_id):
     """Like a post."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE community_posts SET likes = likes + 1 WHERE id = ?", (post_id,))
-        conn.commit()
-        cursor.execute("SELECT likes FROM community_posts WHERE id = ?", (post_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = run_write(_add_like, post_id)
         if not row:
             return jsonify({'success': False, 'error': 'Post not found'}), 404
         return jsonify({'success': True, 'likes': row['likes']}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _add_like(conn, post_id):
+    """Increment a post's likes (writer operation); returns the row with the new count"""
+    conn.execute("UPDATE community_posts SET likes = likes + 1 WHERE id = ?", (post_id,))
+    return conn.execute("SELECT likes FROM community_posts WHERE id = ?", (post_id,)).fetchone()
@@ -3,15 +3,36 @@ Location Routes
 Real-time location tracking and sharing
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from datetime import datetime
 from database.db import get_db_connection
+from database.writer import run_write
+from services.session_store import get_session_store
+from services.location_pubsub import subscribe, publish, stream_events
+from services import location_buffer
+from services.latest_location import get_latest, record as record_latest, upsert_latest
+from services.location_service import parse_timestamps, validate_location_batch
+from services.trajectory import simplify_track, to_epoch
+from services.location_archive import read_archive
+import gzip
+import json
+import math
+import os
+import time
 import uuid
 
 location_bp = Blueprint('location', __name__)
 
-# Store active location shares (in production, use Redis)
-active_shares = {}
+# Batch upload limits
+BATCH_MAX_FIXES = int(os.getenv('LOCATION_BATCH_MAX_FIXES', 5000))
+BATCH_MAX_AGE_SECONDS = int(os.getenv('LOCATION_BATCH_MAX_AGE_SECONDS', 7 * 24 * 3600))
+BATCH_MAX_CLOCK_SKEW_SECONDS = 300
+
+# Raw fixes read for one downsampled history request
+HISTORY_MAX_RAW_POINTS = int(os.getenv('HISTORY_MAX_RAW_POINTS', 100000))
+
+# Active location shares live in the shared session store and expire with the share
+SHARE_NAMESPACE = 'share'
 
 @location_bp.route('/update', methods=['POST'])
 def update_location():
@@ -23,22 +44,50 @@ def update_location():
         "longitude": float,
         "accuracy": float (optional)
     }
+    
+    Fixes are written behind (see location_buffer), so history reads may trail
+    by up to LOCATION_BUFFER_FLUSH_SECONDS; live streams get the fix immediately.
+    Fixes are validated here with the same rules as /batch, since a bad row
+    would otherwise only surface when the buffer is flushed.
     """
     try:
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data.get('user_id'):
+            return jsonify({
+                'success': False,
+                'error': 'user_id, latitude and longitude are required'
+            }), 400
         user_id = data.get('user_id')
-        latitude = data.get('latitude')
-        longitude = data.get('longitude')
-        accuracy = data.get('accuracy', 0)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO location_history (id, user_id, latitude, longitude, accuracy, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (str(uuid.uuid4()), user_id, latitude, longitude, accuracy, datetime.now()))
-        conn.commit()
-        conn.close()
+        now = time.time()
+        valid, rejected = validate_location_batch(
+            [data.get('latitude')], [data.get('longitude')], [data.get('accuracy')], [now],
+            now, BATCH_MAX_AGE_SECONDS, BATCH_MAX_CLOCK_SKEW_SECONDS
+        )
+        if rejected:
+            return jsonify({
+                'success': False,
+                'error': rejected[0][1]
+            }), 400
+        latitude, longitude = float(data['latitude']), float(data['longitude'])
+        accuracy = float(data.get('accuracy') or 0)
+        
+        fix_id = str(uuid.uuid4())
+        created_at = datetime.fromtimestamp(now)
+        
+        row = (fix_id, user_id, latitude, longitude, accuracy, created_at)
+        location_buffer.add(row)
+        record_latest(row)
+        
+        # Push to anyone following this user (share or SOS streams)
+        publish(f'location:{user_id}', 'location', {
+            'id': fix_id,
+            'user_id': user_id,
+            'latitude': latitude,
+            'longitude': longitude,
+            'accuracy': accuracy,
+            'created_at': created_at.isoformat()
+        })
         
         return jsonify({
             'success': True,
@@ -52,6 +101,101 @@ def update_location():
             'error': str(e)
         }), 500
 
+@location_bp.route('/batch', methods=['POST'])
+def upload_location_batch():
+    """
+    Upload fixes recorded while offline
+    Request body (optionally gzip-compressed with Content-Encoding: gzip): {
+        "user_id": "string",
+        "fixes": [
+            {"latitude": float, "longitude": float, "accuracy": float (optional),
+             "timestamp": epoch seconds | epoch milliseconds | ISO 8601 string}
+        ]
+    }
+    
+    Valid fixes are stored in one transaction with their device timestamps.
+    Invalid fixes are skipped and reported by index. Replaying the same batch
+    is harmless (fix ids are derived from user, time and position).
+    """
+    try:
+        body = request.get_data()
+        if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        data = json.loads(body)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'Batch must be a JSON object'
+            }), 400
+        
+        user_id = data.get('user_id')
+        fixes = data.get('fixes') or []
+        if not user_id or not isinstance(fixes, list):
+            return jsonify({
+                'success': False,
+                'error': 'user_id and a fixes array are required'
+            }), 400
+        if len(fixes) > BATCH_MAX_FIXES:
+            return jsonify({
+                'success': False,
+                'error': f'At most {BATCH_MAX_FIXES} fixes per batch'
+            }), 413
+        
+        fixes = [fix if isinstance(fix, dict) else {} for fix in fixes]
+        timestamps = parse_timestamps([fix.get('timestamp') for fix in fixes])
+        valid, rejected = validate_location_batch(
+            [fix.get('latitude') for fix in fixes],
+            [fix.get('longitude') for fix in fixes],
+            [fix.get('accuracy') for fix in fixes],
+            timestamps,
+            time.time(),
+            BATCH_MAX_AGE_SECONDS,
+            BATCH_MAX_CLOCK_SKEW_SECONDS
+        )
+        
+        rows = []
+        for i in sorted(valid.nonzero()[0], key=lambda i: timestamps[i]):
+            fix = fixes[i]
+            latitude, longitude = float(fix['latitude']), float(fix['longitude'])
+            fix_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{user_id}:{timestamps[i]:.3f}:{latitude}:{longitude}"))
+            rows.append((fix_id, user_id, latitude, longitude, float(fix.get('accuracy') or 0),
+                         datetime.fromtimestamp(timestamps[i])))
+        
+        inserted = 0
+        if rows:
+            inserted = run_write(_insert_fixes, rows)
+            record_latest(rows[-1])
+            
+            # Followers only need the newest position from a replayed batch
+            fix_id, _, latitude, longitude, accuracy, created_at = rows[-1]
+            publish(f'location:{user_id}', 'location', {
+                'id': fix_id,
+                'user_id': user_id,
+                'latitude': latitude,
+                'longitude': longitude,
+                'accuracy': accuracy,
+                'created_at': created_at.isoformat()
+            })
+        
+        return jsonify({
+            'success': True,
+            'accepted': len(rows),
+            'inserted': inserted,
+            'duplicates': len(rows) - inserted,
+            'rejected': [{'index': i, 'reason': reason} for i, reason in rejected]
+        }), 200
+        
+    except (OSError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Malformed batch: {e}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @location_bp.route('/share', methods=['POST'])
 def share_location():
     """
@@ -70,21 +214,21 @@ def share_location():
         
         share_id = str(uuid.uuid4())
         
-        active_shares[share_id] = {
+        get_session_store().set(SHARE_NAMESPACE, share_id, {
             'user_id': user_id,
             'contacts': contacts,
             'started_at': datetime.now().isoformat(),
             'duration_minutes': duration,
             'active': True
-        }
+        }, duration * 60)
         
-        # Send sharing link to contacts via SMS
-        from services.notification_service import send_sms
+        # Queue the sharing link for each contact (delivered by the outbox dispatcher)
+        from services.notification_outbox import enqueue_sms
         share_link = f"https://safehertravel.com/track/{share_id}"
         
         for contact in contacts:
             message = f"Location sharing activated. Track here: {share_link}"
-            send_sms(contact, message)
+            enqueue_sms(contact, message, idempotency_key=f"share:{share_id}:{contact}")
         
         return jsonify({
             'success': True,
@@ -102,25 +246,11 @@ def share_location():
 @location_bp.route('/track/<share_id>', methods=['GET'])
 def track_location(share_id):
     """Get shared location data"""
-    if share_id in active_shares:
-        share = active_shares[share_id]
-        
-        # Get latest location
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM location_history
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            LIMIT 1
-        """, (share['user_id'],))
-        
-        location = cursor.fetchone()
-        conn.close()
-        
+    share = get_session_store().get(SHARE_NAMESPACE, share_id)
+    if share is not None:
         return jsonify({
             'success': True,
-            'location': dict(location) if location else None,
+            'location': get_latest(share['user_id']),
             'share_info': share
         }), 200
     else:
@@ -129,31 +259,145 @@ def track_location(share_id):
             'error': 'Share not found or expired'
         }), 404
 
+@location_bp.route('/stream/<share_id>', methods=['GET'])
+def stream_location(share_id):
+    """
+    Live location stream for a share (Server-Sent Events)
+    
+    Sends the latest known fix, then a 'location' event for every new fix
+    until the share expires ('end' event).
+    """
+    store = get_session_store()
+    share = store.get(SHARE_NAMESPACE, share_id)
+    if share is None:
+        return jsonify({
+            'success': False,
+            'error': 'Share not found or expired'
+        }), 404
+    
+    # Subscribe before reading the latest fix so nothing lands in between unseen
+    subscription = subscribe([f"location:{share['user_id']}"])
+    latest = get_latest(share['user_id'])
+    initial = [('location', latest)] if latest else []
+    
+    return sse_response(stream_events(
+        subscription,
+        initial,
+        lambda: store.get(SHARE_NAMESPACE, share_id) is not None,
+        poll_latest=lambda: get_latest(share['user_id'])
+    ))
+
+def sse_response(events):
+    """Wrap an SSE generator in a streaming response (unbuffered by proxies)"""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @location_bp.route('/history/<user_id>', methods=['GET'])
 def get_location_history(user_id):
-    """Get location history for a user"""
+    """
+    Get location history for a user
+    
+    Query parameters:
+        limit: Most recent raw fixes to return (default 100) when not downsampling
+        since, until: Time range (epoch seconds/milliseconds or ISO 8601)
+        tolerance_m: Douglas-Peucker tolerance in metres
+        bucket_seconds: At most one fix per time bucket
+        max_points: Upper bound on returned fixes
+        include_archive: 'true' to use full-resolution archived fixes for compacted days
+    
+    With any downsampling parameter the track in [since, until] (up to
+    HISTORY_MAX_RAW_POINTS most recent fixes) is simplified before returning.
+    """
     try:
         limit = int(request.args.get('limit', 100))
+        tolerance_m = request.args.get('tolerance_m', type=float)
+        bucket_seconds = request.args.get('bucket_seconds', type=float)
+        max_points = request.args.get('max_points', type=int)
+        if max_points is not None and max_points < 1:
+            return jsonify({
+                'success': False,
+                'error': 'max_points must be at least 1'
+            }), 400
+        include_archive = request.args.get('include_archive', 'false').lower() == 'true'
+        since, until = (None if math.isnan(ts) else float(ts) for ts in parse_timestamps([
+            _number_or_text(request.args.get('since')),
+            _number_or_text(request.args.get('until'))
+        ]))
+        
+        downsample = bool(tolerance_m or bucket_seconds or max_points)
+        
+        conditions = ["user_id = ?"]
+        params = [user_id]
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(datetime.fromtimestamp(since))
+        if until is not None:
+            conditions.append("created_at <= ?")
+            params.append(datetime.fromtimestamp(until))
+        params.append(HISTORY_MAX_RAW_POINTS if downsample or include_archive else limit)
         
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT * FROM location_history
-            WHERE user_id = ?
+            WHERE {' AND '.join(conditions)}
             ORDER BY created_at DESC
             LIMIT ?
-        """, (user_id, limit))
+        """, params)
         
-        history = cursor.fetchall()
+        history = [dict(loc) for loc in cursor.fetchall()]
         conn.close()
         
+        if not (downsample or include_archive):
+            return jsonify({
+                'success': True,
+                'history': history
+            }), 200
+        
+        history.reverse()
+        if include_archive:
+            archived = read_archive(user_id, since, until)
+            archived_times = {_epoch_ms(fix) for fix in archived}
+            # Compacted days keep a simplified subset in history; the archive has all of them
+            history = sorted(archived + [loc for loc in history if _epoch_ms(loc) not in archived_times],
+                             key=_epoch_ms)
+        
+        simplified = simplify_track(history, tolerance_m, bucket_seconds, max_points)
+        simplified.reverse()
+        
         return jsonify({
             'success': True,
-            'history': [dict(loc) for loc in history]
+            'history': simplified,
+            'input_points': len(history),
+            'output_points': len(simplified)
         }), 200
         
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+def _insert_fixes(conn, rows):
+    """Store batch-uploaded fixes (writer operation); returns how many were new"""
+    cursor = conn.executemany("""
+        INSERT OR IGNORE INTO location_history (id, user_id, latitude, longitude, accuracy, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    upsert_latest(conn, rows)
+    return cursor.rowcount
+
+def _epoch_ms(fix):
+    return round(to_epoch(fix['created_at']) * 1000)
+
+def _number_or_text(value):
+    """Query string value as a number when it is one (epoch timestamps), otherwise as given"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
\ No newline at end of file
@@ -2,36 +2,81 @@
 Resources Routes - Merged Data (DB + OSM)
 """
 
+import os
 from flask import Blueprint, request, jsonify
-from services.mapillary_service import search_pois_overpass, search_pois_mapillary, haversine
-from database.db import get_db_connection
+from services.concurrency import get_executor, gather_with_deadline
+from services.mapillary_service import search_pois_overpass_multi, search_pois_mapillary
+from services.spatial_index import find_within_radius
 
 resources_bp = Blueprint('resources', __name__)
 
+# Amenity -> local table. /police-stations and /hospitals look up their own amenity;
+# /nearby serves the resources page with both from a single OSM query.
+RESOURCE_TABLES = {'police': 'police_stations', 'hospital': 'hospitals'}
+
+# Sources are queried in parallel; the response carries whatever arrived by the deadline
+RESOURCES_DEADLINE_SECONDS = float(os.getenv('RESOURCES_DEADLINE_SECONDS', 8))
+RESOURCES_MAX_WORKERS = int(os.getenv('RESOURCES_MAX_WORKERS', 16))
+
 
 def get_db_resources(table, lat, lng, radius_km):
-    """Fetch resources from local SQLite database."""
+    """Fetch resources from local SQLite database via the spatial index."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {table}")
-        rows = cursor.fetchall()
-        conn.close()
-
-        results = []
-        for row in rows:
-            dist = haversine(lat, lng, row['latitude'], row['longitude'])
-            if dist <= radius_km:
-                d = dict(row)
-                d['distance_km'] = round(dist, 2)
-                d['source'] = 'Local Database'
-                results.append(d)
+        results = find_within_radius(table, lat, lng, radius_km)
+        for d in results:
+            d['source'] = 'Local Database'
         return results
     except Exception as e:
         print(f"DB Error fetching {table}: {e}")
         return []
 
 
+def discover_resources(amenities, lat, lng, radius_m):
+    """
+    Query OSM, Mapillary and the local DB concurrently for one or more amenities,
+    keeping whatever arrives before RESOURCES_DEADLINE_SECONDS. OSM is a single
+    query covering every requested amenity.
+
+    Args:
+        amenities: Keys of RESOURCE_TABLES
+
+    Returns:
+        dict: amenity -> (merged list nearest first, list of sources that failed or missed the deadline)
+    """
+    radius_km = radius_m / 1000
+    executor = get_executor('resources', RESOURCES_MAX_WORKERS)
+    futures = {
+        # Try OSM (usually most complete)
+        'osm': executor.submit(search_pois_overpass_multi, lat, lng, amenities, radius_m, raise_on_failure=True),
+    }
+    for amenity in amenities:
+        # Try Mapillary (street-view verified)
+        futures[f'mapillary:{amenity}'] = executor.submit(search_pois_mapillary, lat, lng, amenity, radius_m,
+                                                          raise_on_failure=True)
+        # Local DB data (baseline cache)
+        futures[f'database:{amenity}'] = executor.submit(get_db_resources, RESOURCE_TABLES[amenity], lat, lng, radius_km)
+    results, missing = gather_with_deadline(futures, RESOURCES_DEADLINE_SECONDS)
+    if missing:
+        print(f"[RESOURCES] ⏱️ {'+'.join(amenities)}: no answer from {', '.join(missing)} "
+              f"(failed or over {RESOURCES_DEADLINE_SECONDS}s)")
+
+    discovered = {}
+    for amenity in amenities:
+        sources = {
+            'database': results.get(f'database:{amenity}', []),
+            'osm': results.get('osm', {}).get(amenity, []),
+            'mapillary': results.get(f'mapillary:{amenity}', []),
+        }
+        # Merge and deduplicate by name (ignore case); later sources win
+        merged = {}
+        for items in sources.values():
+            for item in items:
+                merged[item['name'].lower()] = item
+        amenity_missing = [name.split(':')[0] for name in missing if name == 'osm' or name.endswith(f':{amenity}')]
+        discovered[amenity] = (sorted(merged.values(), key=lambda x: x['distance_km']), amenity_missing)
+    return discovered
+
+
 @resources_bp.route('/police-stations', methods=['GET'])
 def get_police_stations():
     """Fetch nearby police stations from all sources (Mapillary + OSM + Cache)."""
@@ -40,35 +85,18 @@ def get_police_stations():
         lng = float(request.args.get('lng'))
         # Default to 30km for comprehensive coverage
         radius_m = int(request.args.get('radius', 30000))
-        radius_km = radius_m / 1000
 
         print(f"[RESOURCES] 🚓 Searching Police for {lat},{lng} (Radius: {radius_m}m)")
         
-        # 1. Fetch Priority Live Data
-        # Try OSM (usually most complete)
-        osm_stations = search_pois_overpass(lat, lng, 'police', radius_m)
-        # Try Mapillary (street-view verified)
-        mapillary_stations = search_pois_mapillary(lat, lng, 'police', radius_m)
-        
-        # 2. Add local DB data (baseline cache)
-        db_stations = get_db_resources('police_stations', lat, lng, radius_km)
-        
-        # 3. Merge and deduplicate by name (ignore case)
-        merged = {}
-        for s in db_stations:
-            merged[s['name'].lower()] = s
-        for s in osm_stations:
-            merged[s['name'].lower()] = s
-        for s in mapillary_stations:
-            merged[s['name'].lower()] = s
-            
-        final_list = sorted(merged.values(), key=lambda x: x['distance_km'])
+        final_list, missing = discover_resources(['police'], lat, lng, radius_m)['police']
 
         return jsonify({
             'success': True,
             'count': len(final_list),
             'stations': final_list,
             'source': 'Live Discovery (Mapillary + OSM + Cache)',
+            'missing_sources': missing,
+            'partial': bool(missing),
             'radius_m': radius_m,
             'user_location': {'lat': lat, 'lng': lng}
         }), 200
@@ -85,33 +113,18 @@ def get_hospitals():
         lng = float(request.args.get('lng'))
         # Default to 30km for comprehensive coverage
         radius_m = int(request.args.get('radius', 30000))
-        radius_km = radius_m / 1000
 
         print(f"[RESOURCES] 🏥 Searching Hospitals for {lat},{lng} (Radius: {radius_m}m)")
         
-        # 1. Fetch Priority Live Data
-        osm_hospitals = search_pois_overpass(lat, lng, 'hospital', radius_m)
-        mapillary_hospitals = search_pois_mapillary(lat, lng, 'hospital', radius_m)
-        
-        # 2. Add local DB data (baseline cache)
-        db_hospitals = get_db_resources('hospitals', lat, lng, radius_km)
-        
-        # 3. Merge and deduplicate by name (ignore case)
-        merged = {}
-        for h in db_hospitals:
-            merged[h['name'].lower()] = h
-        for h in osm_hospitals:
-            merged[h['name'].lower()] = h
-        for h in mapillary_hospitals:
-            merged[h['name'].lower()] = h
-            
-        final_list = sorted(merged.values(), key=lambda x: x['distance_km'])
+        final_list, missing = discover_resources(['hospital'], lat, lng, radius_m)['hospital']
 
         return jsonify({
             'success': True,
             'count': len(final_list),
             'hospitals': final_list,
             'source': 'Live Discovery (Mapillary + OSM + Cache)',
+            'missing_sources': missing,
+            'partial': bool(missing),
             'radius_m': radius_m,
             'user_location': {'lat': lat, 'lng': lng}
         }), 200
@@ -120,6 +133,37 @@ def get_hospitals():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@resources_bp.route('/nearby', methods=['GET'])
+def get_nearby_resources():
+    """Police stations and hospitals together, for screens that show both (one OSM query for both)."""
+    try:
+        lat = float(request.args.get('lat'))
+        lng = float(request.args.get('lng'))
+        # Default to 30km for comprehensive coverage
+        radius_m = int(request.args.get('radius', 30000))
+
+        print(f"[RESOURCES] 🗺️ Searching Police + Hospitals for {lat},{lng} (Radius: {radius_m}m)")
+
+        discovered = discover_resources(list(RESOURCE_TABLES), lat, lng, radius_m)
+        stations, police_missing = discovered['police']
+        hospitals, hospital_missing = discovered['hospital']
+
+        return jsonify({
+            'success': True,
+            'counts': {'police': len(stations), 'hospital': len(hospitals)},
+            'stations': stations,
+            'hospitals': hospitals,
+            'source': 'Live Discovery (Mapillary + OSM + Cache)',
+            'missing_sources': {'police': police_missing, 'hospital': hospital_missing},
+            'partial': bool(police_missing or hospital_missing),
+            'radius_m': radius_m,
+            'user_location': {'lat': lat, 'lng': lng}
+        }), 200
+    except Exception as e:
+        print(f"[RESOURCES ERROR] Nearby: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @resources_bp.route('/emergency-contacts', methods=['GET'])
 def get_emergency_contacts():
     return jsonify({
@@ -5,15 +5,31 @@ Handles SOS activation, emergency contacts, and alert broadcasting
 
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-from services.notification_service import send_sms, send_email
-from services.police_service import alert_nearest_police
+from functools import partial
+from services.concurrency import get_executor, gather_with_deadline
+from services.notification_outbox import enqueue_sms, enqueue_email
+from services.police_service import alert_nearest_police, nearest_police_precomputed
+from services.session_store import get_session_store
+from services.location_pubsub import subscribe, publish, stream_events
+from services.latest_location import get_latest
+from routes.location_routes import sse_response
 from database.db import get_db_connection
+from database.writer import execute_write, run_write, submit_write
+import os
 import uuid
 
 sos_bp = Blueprint('sos', __name__)
 
-# Active SOS sessions storage (in production, use Redis)
-active_sos_sessions = {}
+# Maximum time /activate waits for police lookup and notifications before answering
+SOS_RESPONSE_BUDGET_SECONDS = float(os.getenv('SOS_RESPONSE_BUDGET_SECONDS', 3))
+SOS_MAX_WORKERS = int(os.getenv('SOS_MAX_WORKERS', 32))
+
+# Police results that name no actual station
+HELPLINE_SOURCES = ('National Helpline', 'System Fallback')
+
+# Active SOS sessions live in the shared session store so every worker sees them
+SOS_NAMESPACE = 'sos'
+SOS_SESSION_TTL_SECONDS = int(os.getenv('SOS_SESSION_TTL_SECONDS', 24 * 3600))
 
 @sos_bp.route('/activate', methods=['POST'])
 def activate_sos():
@@ -24,6 +40,12 @@ def activate_sos():
         "location": {"lat": float, "lng": float},
         "emergency_contacts": ["phone1", "phone2"]
     }
+    
+    The alert is persisted first, then SMS and email are queued in the notification
+    outbox (delivered with retries by its dispatcher). The nearest police station is
+    answered immediately from the precomputed grid while the live lookup runs; the
+    live result replaces it if it arrives within SOS_RESPONSE_BUDGET_SECONDS, otherwise
+    the lookup is listed under 'pending' and refines the session in the background.
     """
     try:
         data = request.json
@@ -34,40 +56,60 @@ def activate_sos():
         # Generate unique SOS session ID
         sos_id = str(uuid.uuid4())
         
-        # Store SOS session
-        active_sos_sessions[sos_id] = {
+        # Save to database before anything that can be slow (waits for the commit)
+        run_write(execute_write("""
+            INSERT INTO sos_alerts (id, user_id, latitude, longitude, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (sos_id, user_id, location['lat'], location['lng'], 'active', datetime.now())))
+        
+        session = {
             'user_id': user_id,
             'location': location,
             'status': 'active',
             'activated_at': datetime.now().isoformat(),
-            'emergency_contacts': emergency_contacts
+            'emergency_contacts': emergency_contacts,
+            'police_station': nearest_police_precomputed(location),
+            'notifications': {},
+            'pending': []
         }
         
-        # Alert nearest police station
-        police_response = alert_nearest_police(location)
+        # Start the police lookup, then queue notifications while it runs
+        executor = get_executor('sos', SOS_MAX_WORKERS)
+        tasks = {'police': executor.submit(alert_nearest_police, location)}
         
-        # Send SMS to emergency contacts
+        message = f"EMERGENCY ALERT: Your contact has activated SOS. Location: https://maps.google.com/?q={location['lat']},{location['lng']}"
         for contact in emergency_contacts:
-            message = f"EMERGENCY ALERT: Your contact has activated SOS. Location: https://maps.google.com/?q={location['lat']},{location['lng']}"
-            send_sms(contact, message)
+            enqueue_sms(contact, message, idempotency_key=f"sos:{sos_id}:sms:{contact}")
+            session['notifications'][f'sms:{contact}'] = 'queued'
         
-        # Send email notifications
         if 'email' in data:
-            send_email(
+            enqueue_email(
                 data['email'],
                 "SOS Alert Activated",
-                f"Your SOS alert has been activated. Help is on the way. Location: {location}"
+                f"Your SOS alert has been activated. Help is on the way. Location: {location}",
+                idempotency_key=f"sos:{sos_id}:email:{data['email']}"
             )
+            session['notifications'][f"email:{data['email']}"] = 'queued'
         
-        # Save to database
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO sos_alerts (id, user_id, latitude, longitude, status, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (sos_id, user_id, location['lat'], location['lng'], 'active', datetime.now()))
-        conn.commit()
-        conn.close()
+        results, pending = gather_with_deadline(tasks, SOS_RESPONSE_BUDGET_SECONDS)
+        
+        for name, value in results.items():
+            _record_sos_step(session, name, value)
+        session['pending'].extend(pending)
+        
+        # Store the session before attaching callbacks that update it
+        get_session_store().set(SOS_NAMESPACE, sos_id, session, SOS_SESSION_TTL_SECONDS)
+        for name in pending:
+            # Runs immediately if the step already failed, otherwise when it finishes
+            tasks[name].add_done_callback(partial(_complete_sos_step, sos_id, name))
+        
+        police_response = session['police_station'] or {
+            'name': 'Emergency Dispatch Control',
+            'phone': '112',
+            'eta_minutes': 6,
+            'source': 'National Helpline',
+            'status': 'pending'
+        }
         
         return jsonify({
             'success': True,
@@ -75,6 +117,8 @@ def activate_sos():
             'message': 'SOS activated successfully',
             'police_station': police_response,
             'eta_minutes': police_response.get('eta_minutes', 6),
+            'notifications': session['notifications'],
+            'pending': list(session['pending']),
             'status': 'active'
         }), 200
         
@@ -84,13 +128,43 @@ def activate_sos():
             'error': str(e)
         }), 500
 
+def _record_sos_step(session, name, value):
+    """Store the outcome of one SOS step on its session"""
+    if name == 'police':
+        # A live result refines the precomputed one, a generic helpline fallback does not
+        if value and (session['police_station'] is None or value.get('source') not in HELPLINE_SOURCES):
+            session['police_station'] = value
+
+def _complete_sos_step(sos_id, name, future):
+    """Background completion of a step that missed the response budget"""
+    try:
+        value = future.result()
+    except Exception as e:
+        print(f"[SOS] Step {name} for {sos_id} failed: {e}")
+        value = None
+    
+    def apply(session):
+        _record_sos_step(session, name, value)
+        if name in session['pending']:
+            session['pending'].remove(name)
+    
+    try:
+        session = get_session_store().update(SOS_NAMESPACE, sos_id, apply)
+        if session is not None:
+            publish(f'sos:{sos_id}', 'sos', session)
+            print(f"[SOS] Step {name} for {sos_id} finished after the response budget")
+    except Exception as e:
+        print(f"[SOS] Could not record step {name} for {sos_id}: {e}")
+
 @sos_bp.route('/status/<sos_id>', methods=['GET'])
 def get_sos_status(sos_id):
     """Get current status of SOS alert"""
-    if sos_id in active_sos_sessions:
+    session = get_session_store().get(SOS_NAMESPACE, sos_id)
+    if session is not None:
         return jsonify({
             'success': True,
-            'sos': active_sos_sessions[sos_id]
+            'sos': session,
+            'current_location': get_latest(session['user_id'])
         }), 200
     else:
         return jsonify({
@@ -98,24 +172,52 @@ def get_sos_status(sos_id):
             'error': 'SOS session not found'
         }), 404
 
+@sos_bp.route('/stream/<sos_id>', methods=['GET'])
+def stream_sos(sos_id):
+    """
+    Live SOS stream (Server-Sent Events) for responders and contacts
+    
+    Sends the session and latest fix, then 'sos' events as the session changes and
+    'location' events for every new fix, until the alert is resolved or expires.
+    """
+    store = get_session_store()
+    session = store.get(SOS_NAMESPACE, sos_id)
+    if session is None:
+        return jsonify({
+            'success': False,
+            'error': 'SOS session not found'
+        }), 404
+    
+    subscription = subscribe([f'sos:{sos_id}', f"location:{session['user_id']}"])
+    initial = [('sos', session)]
+    latest = get_latest(session['user_id'])
+    if latest:
+        initial.append(('location', latest))
+    
+    def is_active():
+        current = store.get(SOS_NAMESPACE, sos_id)
+        return current is not None and current['status'] == 'active'
+    
+    return sse_response(stream_events(subscription, initial, is_active,
+                                      poll_latest=lambda: get_latest(session['user_id'])))
+
 @sos_bp.route('/deactivate/<sos_id>', methods=['POST'])
 def deactivate_sos(sos_id):
     """Deactivate SOS alert"""
     try:
-        if sos_id in active_sos_sessions:
-            active_sos_sessions[sos_id]['status'] = 'resolved'
-            active_sos_sessions[sos_id]['resolved_at'] = datetime.now().isoformat()
-            
-            # Update database
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
+        def resolve(session):
+            session['status'] = 'resolved'
+            session['resolved_at'] = datetime.now().isoformat()
+        
+        session = get_session_store().update(SOS_NAMESPACE, sos_id, resolve)
+        if session is not None:
+            publish(f'sos:{sos_id}', 'sos', session)
+            # Update database (the session store already reflects the resolution)
+            submit_write(execute_write("""
                 UPDATE sos_alerts 
                 SET status = 'resolved', resolved_at = ?
                 WHERE id = ?
-            """, (datetime.now(), sos_id))
-            conn.commit()
-            conn.close()
+            """, (datetime.now(), sos_id)))
             
             return jsonify({
                 'success': True,
@@ -5,6 +5,7 @@ User Routes - Enhanced with phone+OTP based authentication
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 from database.db import get_db_connection
+from database.writer import execute_write, run_write, submit_write
 import uuid
 import random
 import hashlib
@@ -93,8 +94,8 @@ def register():
         # Check for existing user
         cursor.execute("SELECT id FROM users WHERE phone = ? OR email = ?", (phone, data.get('email')))
         existing = cursor.fetchone()
+        conn.close()
         if existing:
-            conn.close()
             return jsonify({'success': False, 'error': 'Phone number or email already registered. Please login.'}), 409
 
         user_id = str(uuid.uuid4())
@@ -105,28 +106,29 @@ def register():
         password = data.get('password')
         hashed_pw = hash_password(password) if password else hash_password(phone)
 
-        # Insert user
-        cursor.execute("""
-            INSERT INTO users (id, name, email, phone, password, city, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (user_id, name, email, phone, hashed_pw, city, datetime.now()))
-
-        # Save session
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_sessions (id, user_id, token, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (str(uuid.uuid4()), user_id, token, datetime.now()))
-
-        # Save emergency contacts
-        for contact_phone in emergency_contacts:
-            if contact_phone.strip():
-                cursor.execute("""
-                    INSERT INTO emergency_contacts (id, user_id, name, phone, relationship, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (str(uuid.uuid4()), user_id, 'Emergency Contact', contact_phone.strip(), 'Emergency', datetime.now()))
-
-        conn.commit()
-        conn.close()
+        def create_account(conn):
+            # Insert user
+            conn.execute("""
+                INSERT INTO users (id, name, email, phone, password, city, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, name, email, phone, hashed_pw, city, datetime.now()))
+
+            # Save session
+            conn.execute("""
+                INSERT OR REPLACE INTO user_sessions (id, user_id, token, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (str(uuid.uuid4()), user_id, token, datetime.now()))
+
+            # Save emergency contacts
+            for contact_phone in emergency_contacts:
+                if contact_phone.strip():
+                    conn.execute("""
+                        INSERT INTO emergency_contacts (id, user_id, name, phone, relationship, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (str(uuid.uuid4()), user_id, 'Emergency Contact', contact_phone.strip(), 'Emergency', datetime.now()))
+
+        # One writer operation, so the account is created whole or not at all
+        run_write(create_account)
 
         return jsonify({
             'success': True,
@@ -184,13 +186,12 @@ def login():
             conn.close()
             return jsonify({'success': False, 'error': 'Email+Password or Phone+OTP required'}), 400
 
-        # Create new session token
+        # Create new session token (queued; nothing reads it back in this request)
         token = str(uuid.uuid4())
-        cursor.execute("""
+        submit_write(execute_write("""
             INSERT OR REPLACE INTO user_sessions (id, user_id, token, created_at)
             VALUES (?, ?, ?, ?)
-        """, (str(uuid.uuid4()), user['id'], token, datetime.now()))
-        conn.commit()
+        """, (str(uuid.uuid4()), user['id'], token, datetime.now())))
 
         # Get emergency contacts
         cursor.execute("SELECT phone FROM emergency_contacts WHERE user_id = ?", (user['id'],))
@@ -242,14 +243,10 @@ def add_emergency_contact():
     try:
         data = request.json
         contact_id = str(uuid.uuid4())
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        run_write(execute_write("""
             INSERT INTO emergency_contacts (id, user_id, name, phone, relationship, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (contact_id, data['user_id'], data['name'], data['phone'], data.get('relationship', 'Emergency Contact'), datetime.now()))
-        conn.commit()
-        conn.close()
+        """, (contact_id, data['user_id'], data['name'], data['phone'], data.get('relationship', 'Emergency Contact'), datetime.now())))
         return jsonify({'success': True, 'contact_id': contact_id}), 201
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,56 @@
+"""
+Concurrency Helpers
+Named, bounded thread pools and deadline-based gathering for fan-out work
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Tuple
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """
+    Get (or create) a shared bounded pool. Each use case gets its own pool so a
+    slow upstream in one cannot starve the others.
+    """
+    executor = _executors.get(name)
+    if executor:
+        return executor
+    with _executors_lock:
+        executor = _executors.get(name)
+        if not executor:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            _executors[name] = executor
+        return executor
+
+
+def gather_with_deadline(futures: Dict, timeout: float) -> Tuple[Dict, List]:
+    """
+    Wait up to timeout seconds for a set of named futures
+
+    Args:
+        futures: Dict of name -> Future
+        timeout: Overall deadline in seconds
+
+    Returns:
+        tuple: (results, missing) where results maps name -> value for every future
+               that finished successfully, and missing lists the names that timed out
+               or failed. Unfinished futures keep running in the background.
+    """
+    done, _ = wait(list(futures.values()), timeout=timeout)
+
+    results = {}
+    missing = []
+    for name, future in futures.items():
+        if future not in done:
+            missing.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"[CONCURRENCY] Task '{name}' failed: {e}")
+            missing.append(name)
+    return results, missing
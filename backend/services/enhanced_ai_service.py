@@ -80,7 +80,7 @@ def get_real_time_context(user_location: Optional[Dict] = None) -> str:
     Focuses on safety status and warnings.
     """
     try:
-        from services.mapillary_service import search_pois_overpass
+        from services.mapillary_service import search_pois_overpass_multi
         
         context_parts = ["🛡️ CURRENT SAFETY CONTEXT:"]
         
@@ -88,9 +88,10 @@ def get_real_time_context(user_location: Optional[Dict] = None) -> str:
             lat, lng = user_location['lat'], user_location['lng']
             radius_m = 10000
             
-            # Get live data from OSM
-            police = search_pois_overpass(lat, lng, 'police', radius_m)
-            hospitals = search_pois_overpass(lat, lng, 'hospital', radius_m)
+            # Get live data from OSM (one upstream query for both categories)
+            live = search_pois_overpass_multi(lat, lng, ['police', 'hospital'], radius_m)
+            police = live['police']
+            hospitals = live['hospital']
             
             # Analyze safety density
             total_emergency = len(police) + len(hospitals)
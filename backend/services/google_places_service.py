@@ -4,12 +4,26 @@ Integration with Google Places API for hotels, reviews, and accommodations
 """
 
 import os
-import requests
+from services import http_client
+from services.concurrency import get_executor
+from services.ttl_cache import TTLCache
 from typing import List, Dict, Optional
 
 GOOGLE_PLACES_API_KEY = os.getenv('GOOGLE_PLACES_API_KEY', '')
 PLACES_API_BASE = 'https://maps.googleapis.com/maps/api/place'
 
+# Details lookups for a search run concurrently on a small pool
+PLACES_DETAILS_WORKERS = int(os.getenv('PLACES_DETAILS_WORKERS', 5))
+
+# Phone, website and reviews rarely change, so details are cached per place_id for a long time
+PLACE_DETAILS_TTL = int(os.getenv('PLACE_DETAILS_TTL_SECONDS', 7 * 24 * 3600))
+_details_cache = TTLCache(
+    'place_details',
+    max_entries=int(os.getenv('PLACE_DETAILS_CACHE_MAX_ENTRIES', 5000)),
+    default_ttl=PLACE_DETAILS_TTL,
+    negative_ttl=60,
+)
+
 def search_hotels_nearby(latitude: float, longitude: float, radius: int = 5000) -> List[Dict]:
     """
     Search for hotels near a location using Google Places API
@@ -36,7 +50,7 @@ def search_hotels_nearby(latitude: float, longitude: float, radius: int = 5000)
             'key': GOOGLE_PLACES_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -44,8 +58,14 @@ def search_hotels_nearby(latitude: float, longitude: float, radius: int = 5000)
             print(f"Places API Error: {data.get('status')}")
             return get_fallback_hotels(latitude, longitude)
         
+        places = data.get('results', [])[:10]  # Get top 10
+        
+        # Fetch details for all places concurrently (cached per place_id)
+        executor = get_executor('places', PLACES_DETAILS_WORKERS)
+        all_details = list(executor.map(get_place_details, [place.get('place_id') for place in places]))
+        
         hotels = []
-        for place in data.get('results', [])[:10]:  # Get top 10
+        for place, details in zip(places, all_details):
             hotel = {
                 'id': place.get('place_id'),
                 'name': place.get('name'),
@@ -59,8 +79,7 @@ def search_hotels_nearby(latitude: float, longitude: float, radius: int = 5000)
                 'photo_reference': place.get('photos', [{}])[0].get('photo_reference') if place.get('photos') else None
             }
             
-            # Get detailed place information including reviews
-            details = get_place_details(place.get('place_id'))
+            # Detailed place information including reviews
             if details:
                 hotel.update({
                     'phone': details.get('formatted_phone_number'),
@@ -79,11 +98,15 @@ def search_hotels_nearby(latitude: float, longitude: float, radius: int = 5000)
         return get_fallback_hotels(latitude, longitude)
 
 def get_place_details(place_id: str) -> Optional[Dict]:
-    """Get detailed information about a place including reviews"""
+    """Get detailed information about a place including reviews (cached per place_id)"""
     try:
         if not GOOGLE_PLACES_API_KEY or not place_id:
             return None
         
+        found, cached = _details_cache.get(place_id)
+        if found:
+            return cached
+        
         url = f"{PLACES_API_BASE}/details/json"
         params = {
             'place_id': place_id,
@@ -91,17 +114,21 @@ def get_place_details(place_id: str) -> Optional[Dict]:
             'key': GOOGLE_PLACES_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
         if data.get('status') == 'OK':
-            return data.get('result', {})
+            details = data.get('result', {})
+            _details_cache.set(place_id, details)
+            return details
         
+        _details_cache.set_negative(place_id)
         return None
         
     except Exception as e:
         print(f"Error fetching place details: {e}")
+        _details_cache.set_negative(place_id)
         return None
 
 def calculate_safety_rating(place_details: Dict) -> float:
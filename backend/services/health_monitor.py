@@ -0,0 +1,169 @@
+"""
+Health Monitor
+Background readiness probes. A monitor thread refreshes a snapshot every
+HEALTH_PROBE_INTERVAL_SECONDS: database latency, writer queue and row counts,
+cache hit rates, notification outbox depth, and reachability/latency of the
+Overpass, Mapillary and Gemini upstreams. /api/health only reads the last
+snapshot, so load balancer polling never touches the database or the network.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from services import http_client
+from services.concurrency import get_executor, gather_with_deadline
+
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv('HEALTH_PROBE_INTERVAL_SECONDS', 30))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv('HEALTH_PROBE_TIMEOUT_SECONDS', 5))
+HEALTH_STALE_AFTER_SECONDS = HEALTH_PROBE_INTERVAL_SECONDS * 3   # Snapshot older than this is reported stale
+
+OVERPASS_STATUS_URL = "https://overpass-api.de/api/status"
+MAPILLARY_PROBE_URL = "https://graph.mapillary.com/images"
+GEMINI_PROBE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+_snapshot: Optional[Dict] = None
+_started_pid = None
+_start_lock = threading.Lock()
+
+
+def _timed(probe) -> Dict:
+    """Run a probe, adding its latency; exceptions become an 'error' result"""
+    started = time.perf_counter()
+    try:
+        result = probe()
+    except Exception as e:
+        result = {'status': 'error', 'error': str(e)}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _probe_database() -> Dict:
+    from database.db import db_connection
+    from database.writer import get_writer_stats
+    from services.statistics import get_counters
+
+    with db_connection() as conn:
+        conn.execute("SELECT 1 FROM table_counters LIMIT 1").fetchall()
+    counters = get_counters()
+    return {
+        'status': 'ok',
+        'police_stations': counters.get('police_stations', 0),
+        'hospitals': counters.get('hospitals', 0),
+        'writer_queue': sum(stats['queued'] for stats in get_writer_stats().values())
+    }
+
+
+def _probe_http(url: str, **kwargs) -> Dict:
+    response = http_client.get(url, timeout=HEALTH_PROBE_TIMEOUT_SECONDS, **kwargs)
+    return {
+        'status': 'ok' if response.status_code < 400 else 'error',
+        'http_status': response.status_code
+    }
+
+
+def _probe_overpass() -> Dict:
+    return _probe_http(OVERPASS_STATUS_URL)
+
+
+def _probe_mapillary() -> Dict:
+    from services.mapillary_service import MAPILLARY_ACCESS_TOKEN
+
+    if not MAPILLARY_ACCESS_TOKEN:
+        return {'status': 'not_configured'}
+    return _probe_http(MAPILLARY_PROBE_URL, params={
+        'access_token': MAPILLARY_ACCESS_TOKEN,
+        'fields': 'id',
+        'bbox': '80.27,13.08,80.271,13.081',
+        'limit': 1
+    })
+
+
+def _probe_gemini() -> Dict:
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        return {'status': 'not_configured'}
+    # Key in a header so it never shows up in logged URLs or error messages
+    return _probe_http(GEMINI_PROBE_URL, params={'pageSize': 1}, headers={'x-goog-api-key': api_key})
+
+
+def _probe_outbox() -> Dict:
+    from services.notification_outbox import get_outbox_stats
+
+    depth = get_outbox_stats()
+    return {'status': 'ok', 'pending': depth.get('pending', 0), 'sending': depth.get('sending', 0),
+            'failed': depth.get('failed', 0)}
+
+
+PROBES = {
+    'database': _probe_database,
+    'outbox': _probe_outbox,
+    'overpass': _probe_overpass,
+    'mapillary': _probe_mapillary,
+    'gemini': _probe_gemini,
+}
+
+
+def refresh() -> Dict:
+    """Run every probe in parallel (bounded by HEALTH_PROBE_TIMEOUT_SECONDS) and store the snapshot"""
+    global _snapshot
+    from services.ttl_cache import get_cache_stats
+
+    executor = get_executor('health', len(PROBES))
+    futures = {name: executor.submit(_timed, probe) for name, probe in PROBES.items()}
+    results, missing = gather_with_deadline(futures, HEALTH_PROBE_TIMEOUT_SECONDS + 1)
+    for name in missing:
+        results[name] = {'status': 'timeout'}
+
+    if results['database']['status'] != 'ok':
+        status = 'unhealthy'
+    elif any(result['status'] not in ('ok', 'not_configured') for result in results.values()):
+        status = 'degraded'
+    else:
+        status = 'healthy'
+
+    _snapshot = {
+        'status': status,
+        'checked_at': datetime.now().isoformat(),
+        'checked_at_ts': time.time(),
+        'checks': results,
+        'cache_hit_rates': {name: stats['hit_rate'] for name, stats in get_cache_stats().items()}
+    }
+    return _snapshot
+
+
+def get_snapshot() -> Optional[Dict]:
+    """Last readiness snapshot with its age (None before the first refresh completes)"""
+    start_health_monitor()
+    snapshot = _snapshot
+    if snapshot is None:
+        return None
+    age = time.time() - snapshot['checked_at_ts']
+    result = {key: value for key, value in snapshot.items() if key != 'checked_at_ts'}
+    result['age_seconds'] = round(age, 1)
+    if age > HEALTH_STALE_AFTER_SECONDS:
+        result['status'] = 'stale'
+    return result
+
+
+def _monitor_loop():
+    while True:
+        try:
+            refresh()
+        except Exception as e:
+            print(f"[HEALTH] Probe run failed: {e}")
+        time.sleep(HEALTH_PROBE_INTERVAL_SECONDS)
+
+
+def start_health_monitor():
+    """Start the probe thread once per process (workers forked after import get their own)"""
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        threading.Thread(target=_monitor_loop, name='health-monitor', daemon=True).start()
+        _started_pid = os.getpid()
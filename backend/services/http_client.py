@@ -0,0 +1,102 @@
+"""
+HTTP Client
+Shared outbound HTTP layer: one keep-alive session and connection pool per host,
+with default timeouts and a retry/backoff policy, used by every integration.
+"""
+
+import os
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pool and retry configuration
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))   # Keep-alive connections kept per host
+HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'false').lower() == 'true'  # Wait for a free connection instead of opening extras
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 10))            # Default timeout in seconds
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# POST is only retried on status codes where the request is a pure query
+IDEMPOTENT_POST_HOSTS = {'overpass-api.de'}
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _retry_policy(host: str) -> Retry:
+    methods = set(Retry.DEFAULT_ALLOWED_METHODS)
+    if host in IDEMPOTENT_POST_HOSTS:
+        methods.add('POST')
+    # Connection failures are always safe to retry (the request was never sent)
+    return Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=0,
+        status=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(methods),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def get_session(host: str) -> requests.Session:
+    """Get the shared session for a host, creating its connection pool on first use"""
+    session = _sessions.get(host)
+    if session:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if not session:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                pool_block=HTTP_POOL_BLOCK,
+                max_retries=_retry_policy(host),
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the host's pooled session (default timeout applied)"""
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    return get_session(urlsplit(url).hostname).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
+
+
+def get_http_stats() -> Dict:
+    """Per-host counts of requests sent versus connections opened (the rest reused a pooled connection)"""
+    stats = {}
+    for host, session in list(_sessions.items()):
+        opened = 0
+        requests_sent = 0
+        adapter = session.get_adapter(f'https://{host}')
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool:
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        stats[host] = {
+            'requests': requests_sent,
+            'connections_opened': opened,
+            'connections_reused': max(requests_sent - opened, 0),
+        }
+    return stats
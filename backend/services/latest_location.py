@@ -0,0 +1,109 @@
+"""
+Latest Location Service
+Current position per user, kept in the user_latest_location table (upserted in
+the same transaction as the history insert) and in an in-memory map updated the
+moment a fix is ingested. Reads never touch location_history.
+
+The in-memory entries expire after LATEST_LOCATION_CACHE_SECONDS so fixes
+ingested by other workers are picked up from the table shortly after they flush.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from database.db import get_db_connection
+from database.migrations import ensure_schema
+from services.ttl_cache import TTLCache
+
+LATEST_LOCATION_CACHE_SECONDS = float(os.getenv('LATEST_LOCATION_CACHE_SECONDS', 5))
+LATEST_LOCATION_MAX_USERS = int(os.getenv('LATEST_LOCATION_MAX_USERS', 100000))
+
+# Older fixes (e.g. replayed offline batches) never overwrite a newer position
+UPSERT_SQL = """
+    INSERT INTO user_latest_location (user_id, fix_id, latitude, longitude, accuracy, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        fix_id = excluded.fix_id,
+        latitude = excluded.latitude,
+        longitude = excluded.longitude,
+        accuracy = excluded.accuracy,
+        updated_at = excluded.updated_at
+    WHERE excluded.updated_at > user_latest_location.updated_at
+"""
+
+_latest = TTLCache('latest_location', max_entries=LATEST_LOCATION_MAX_USERS,
+                   default_ttl=LATEST_LOCATION_CACHE_SECONDS, negative_ttl=LATEST_LOCATION_CACHE_SECONDS)
+_record_lock = threading.Lock()
+
+
+def upsert_latest(conn, rows: Iterable[Tuple]):
+    """
+    Upsert latest positions inside the caller's transaction
+
+    Args:
+        conn: Open connection (the caller commits; ensure_schema must have run)
+        rows: location_history rows (id, user_id, latitude, longitude, accuracy, created_at)
+    """
+    conn.executemany(UPSERT_SQL, [
+        (user_id, fix_id, latitude, longitude, accuracy, created_at)
+        for fix_id, user_id, latitude, longitude, accuracy, created_at in rows
+    ])
+
+
+def record(row: Tuple):
+    """Make a just-ingested fix visible to readers in this process immediately (same row layout)"""
+    fix_id, user_id, latitude, longitude, accuracy, created_at = row
+    location = {
+        'id': fix_id,
+        'user_id': user_id,
+        'latitude': latitude,
+        'longitude': longitude,
+        'accuracy': accuracy,
+        # Same text form sqlite3 stores, so cached and table values compare consistently
+        'created_at': str(created_at)
+    }
+    with _record_lock:
+        found, current = _latest.get(user_id)
+        if found and current and current['created_at'] >= location['created_at']:
+            return
+        _latest.set(user_id, location)
+
+
+def get_latest(user_id: str) -> Optional[Dict]:
+    """
+    Current position of a user
+
+    Returns:
+        dict: id, user_id, latitude, longitude, accuracy, created_at; or None if unknown
+    """
+    found, location = _latest.get(user_id)
+    if found:
+        return dict(location) if location else None
+
+    conn = get_db_connection()
+    try:
+        ensure_schema()
+        row = conn.execute(
+            "SELECT * FROM user_latest_location WHERE user_id = ?", (user_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        _latest.set_negative(user_id)
+        return None
+    location = {
+        'id': row['fix_id'],
+        'user_id': row['user_id'],
+        'latitude': row['latitude'],
+        'longitude': row['longitude'],
+        'accuracy': row['accuracy'],
+        'created_at': row['updated_at']
+    }
+    with _record_lock:
+        # A fix recorded while we were reading wins
+        found, current = _latest.get(user_id)
+        if not (found and current and current['created_at'] >= location['created_at']):
+            _latest.set(user_id, location)
+    return dict(location)
@@ -0,0 +1,248 @@
+"""
+Location Archive
+Full-resolution location history moved out of location_history by the
+compaction job, stored as one record per user per day.
+
+Records are written in a columnar format (ENCODING_COLUMNAR): fixes are split
+into blocks of ARCHIVE_BLOCK_SIZE, and each block stores timestamps (ms),
+latitude and longitude (microdegrees) as delta + zigzag varints, and accuracy
+in decimetres as varints, zlib-compressed. A block index at the front of the
+payload lets readers fetch and decompress only the blocks overlapping a time
+range. Payload layout (little endian):
+
+    header  struct HEADER_FORMAT          magic, version, block count
+    index   struct INDEX_FORMAT per block first_ms, last_ms, count, offset, length
+    blocks  zlib(varints: ts deltas | lat deltas | lng deltas | accuracy)
+"""
+
+import zlib
+import struct
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from database.db import get_db_connection
+from database.migrations import ensure_schema
+from services.trajectory import to_epoch
+
+ENCODING_COLUMNAR = 'columnar-v1'
+
+ARCHIVE_BLOCK_SIZE = 512
+
+MAGIC = b'LCOL'
+VERSION = 1
+HEADER_FORMAT = '<4sBI'
+INDEX_FORMAT = '<qqIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+INDEX_SIZE = struct.calcsize(INDEX_FORMAT)
+
+MICRODEGREES = 1_000_000
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def _varint_encode(values: np.ndarray) -> bytes:
+    """LEB128-encode unsigned integers (vectorized)"""
+    values = values.astype(np.uint64)
+    if len(values) == 0:
+        return b''
+    lengths = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+    positions = np.arange(int(lengths.max()))
+    groups = ((values[:, None] >> (positions.astype(np.uint64) * np.uint64(7))) & np.uint64(0x7F)).astype(np.uint8)
+    groups[positions < lengths[:, None] - 1] |= 0x80
+    return groups[positions < lengths[:, None]].tobytes()
+
+
+def _varint_decode(data: bytes) -> np.ndarray:
+    """Decode a run of LEB128 varints (vectorized)"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if len(raw) == 0:
+        return np.empty(0, dtype=np.uint64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    positions = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.uint64) << (positions.astype(np.uint64) * np.uint64(7))
+    return np.add.reduceat(parts, starts)
+
+
+def encode_track(timestamps_ms, lats, lngs, accuracies, block_size: int = ARCHIVE_BLOCK_SIZE) -> bytes:
+    """
+    Encode a time-ordered track in the columnar format
+
+    Args:
+        timestamps_ms: Epoch milliseconds
+        lats, lngs: Degrees (stored at microdegree precision, ~0.1m)
+        accuracies: Metres (stored in decimetres; missing or negative become 0)
+        block_size: Fixes per compressed block
+
+    Returns:
+        bytes: Payload with header, block index and blocks
+    """
+    timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+    lat_u = np.rint(np.asarray(lats, dtype=np.float64) * MICRODEGREES).astype(np.int64)
+    lng_u = np.rint(np.asarray(lngs, dtype=np.float64) * MICRODEGREES).astype(np.int64)
+    acc_dm = np.rint(np.clip(np.nan_to_num(np.asarray(accuracies, dtype=np.float64)), 0, None) * 10).astype(np.int64)
+
+    index, blocks = [], []
+    offset = HEADER_SIZE + INDEX_SIZE * -(-len(timestamps_ms) // block_size)
+    for start in range(0, len(timestamps_ms), block_size):
+        end = min(start + block_size, len(timestamps_ms))
+        columns = np.concatenate([
+            _zigzag(np.diff(timestamps_ms[start:end], prepend=0)),
+            _zigzag(np.diff(lat_u[start:end], prepend=0)),
+            _zigzag(np.diff(lng_u[start:end], prepend=0)),
+            acc_dm[start:end].astype(np.uint64),
+        ])
+        block = zlib.compress(_varint_encode(columns), 9)
+        index.append(struct.pack(INDEX_FORMAT, int(timestamps_ms[start]), int(timestamps_ms[end - 1]),
+                                 end - start, offset, len(block)))
+        blocks.append(block)
+        offset += len(block)
+
+    return struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(blocks)) + b''.join(index) + b''.join(blocks)
+
+
+def iter_track(read: Callable[[int, int], bytes], start_ms: Optional[int] = None,
+               end_ms: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Stream (timestamp_ms, lat, lng, accuracy) from a columnar payload
+
+    Only the blocks overlapping [start_ms, end_ms] are read and decompressed.
+
+    Args:
+        read: read(offset, length) -> bytes over the payload (a slice or an incremental blob reader)
+    """
+    magic, version, block_count = struct.unpack(HEADER_FORMAT, read(0, HEADER_SIZE))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a columnar location archive")
+    index_data = read(HEADER_SIZE, INDEX_SIZE * block_count)
+
+    for b in range(block_count):
+        first_ms, last_ms, count, offset, length = struct.unpack_from(INDEX_FORMAT, index_data, b * INDEX_SIZE)
+        if (start_ms is not None and last_ms < start_ms) or (end_ms is not None and first_ms > end_ms):
+            continue
+        values = _varint_decode(zlib.decompress(read(offset, length)))
+        timestamps = np.cumsum(_unzigzag(values[:count]))
+        lats = np.cumsum(_unzigzag(values[count:2 * count])) / MICRODEGREES
+        lngs = np.cumsum(_unzigzag(values[2 * count:3 * count])) / MICRODEGREES
+        accuracies = values[3 * count:].astype(np.float64) / 10
+        for i in range(count):
+            ts = int(timestamps[i])
+            if (start_ms is None or ts >= start_ms) and (end_ms is None or ts <= end_ms):
+                yield ts, float(lats[i]), float(lngs[i]), float(accuracies[i])
+
+
+def encode_day(rows: List[Dict]) -> Dict:
+    """
+    Encode one user-day of fixes as an archive record (no database access)
+
+    Args:
+        rows: Fixes in time order
+
+    Returns:
+        dict: fix_count, start_ts, end_ts, encoding and payload for archive_day
+    """
+    timestamps_ms = [int(round(to_epoch(row['created_at']) * 1000)) for row in rows]
+    payload = encode_track(
+        timestamps_ms,
+        [row['latitude'] for row in rows],
+        [row['longitude'] for row in rows],
+        [row['accuracy'] if row['accuracy'] is not None else 0 for row in rows]
+    )
+    return {
+        'fix_count': len(rows),
+        'start_ts': timestamps_ms[0] / 1000,
+        'end_ts': timestamps_ms[-1] / 1000,
+        'encoding': ENCODING_COLUMNAR,
+        'payload': payload
+    }
+
+
+def archive_day(conn, user_id: str, day: str, record: Dict) -> bool:
+    """
+    Store an encoded user-day inside the caller's transaction
+
+    Args:
+        conn: Open connection (the caller commits; ensure_schema must have run)
+        record: Output of encode_day
+
+    Returns:
+        bool: False if the day was already archived (e.g. by another worker)
+    """
+    cursor = conn.execute("""
+        INSERT OR IGNORE INTO location_archive
+        (user_id, day, fix_count, start_ts, end_ts, encoding, payload)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (user_id, day, record['fix_count'], record['start_ts'], record['end_ts'],
+          record['encoding'], record['payload']))
+    return cursor.rowcount == 1
+
+
+def _payload_reader(conn, rowid: int):
+    """read(offset, length) over a stored payload, fetching only the requested bytes when possible"""
+    if hasattr(conn, 'blobopen'):
+        blob = conn.blobopen('location_archive', 'payload', rowid, readonly=True)
+
+        def read(offset, length):
+            blob.seek(offset)
+            return blob.read(length)
+        return read, blob.close
+
+    payload = conn.execute("SELECT payload FROM location_archive WHERE rowid = ?", (rowid,)).fetchone()[0]
+    return (lambda offset, length: payload[offset:offset + length]), (lambda: None)
+
+
+def iter_archive(user_id: str, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> Iterator[Dict]:
+    """
+    Stream archived fixes for a user within [start_ts, end_ts] (epoch seconds), in time order
+
+    Archived fixes carry no row id (id is None); created_at has millisecond precision.
+    """
+    start_ms = int(start_ts * 1000) if start_ts is not None else None
+    end_ms = int(end_ts * 1000) if end_ts is not None else None
+
+    conn = get_db_connection()
+    try:
+        ensure_schema()
+        records = conn.execute("""
+            SELECT rowid, encoding FROM location_archive
+            WHERE user_id = ? AND end_ts >= ? AND start_ts <= ?
+            ORDER BY start_ts
+        """, (user_id, start_ts if start_ts is not None else float('-inf'),
+              end_ts if end_ts is not None else float('inf'))).fetchall()
+
+        for record in records:
+            if record['encoding'] != ENCODING_COLUMNAR:
+                raise ValueError(f"Unknown archive encoding {record['encoding']}")
+            read, close = _payload_reader(conn, record['rowid'])
+            try:
+                for ts_ms, lat, lng, accuracy in iter_track(read, start_ms, end_ms):
+                    yield {
+                        'id': None,
+                        'user_id': user_id,
+                        'latitude': lat,
+                        'longitude': lng,
+                        'accuracy': accuracy,
+                        'created_at': str(datetime.fromtimestamp(ts_ms / 1000))
+                    }
+            finally:
+                close()
+    finally:
+        conn.close()
+
+
+def read_archive(user_id: str, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> List[Dict]:
+    """Archived fixes for a user within [start_ts, end_ts] (see iter_archive)"""
+    return list(iter_archive(user_id, start_ts, end_ts))
@@ -0,0 +1,164 @@
+"""
+Location Buffer
+Write-behind ingestion for GPS fixes. Requests append fixes to an in-memory
+buffer and return; a flusher thread writes them to location_history in group
+commits (one executemany per batch) when the buffer reaches a size threshold
+or the flush interval elapses.
+
+Loss bound: a crash loses at most the fixes received in the last flush
+interval (plus any backlog while the database is unavailable, capped at
+LOCATION_BUFFER_CAPACITY). Pending fixes are flushed at interpreter exit.
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+from database.migrations import ensure_schema
+from database.writer import run_write
+from services.latest_location import upsert_latest
+
+LOCATION_BUFFER_MAX_ROWS = int(os.getenv('LOCATION_BUFFER_MAX_ROWS', 500))       # Flush as soon as this many are waiting
+LOCATION_BUFFER_FLUSH_SECONDS = float(os.getenv('LOCATION_BUFFER_FLUSH_SECONDS', 1.0))
+LOCATION_BUFFER_CAPACITY = int(os.getenv('LOCATION_BUFFER_CAPACITY', 50000))    # Oldest fixes are dropped past this backlog
+
+INSERT_SQL = """
+    INSERT OR IGNORE INTO location_history (id, user_id, latitude, longitude, accuracy, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_pending: List[Tuple] = []
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_started_pid = None
+_stats = {'buffered': 0, 'flushed': 0, 'batches': 0, 'failed_flushes': 0, 'dropped': 0, 'rejected': 0,
+          'last_flush_ms': 0.0}
+
+
+def add(row: Tuple):
+    """
+    Buffer one fix for insertion
+
+    Args:
+        row: (id, user_id, latitude, longitude, accuracy, created_at)
+    """
+    add_many([row])
+
+
+def add_many(rows: List[Tuple]):
+    """Buffer several fixes (same row layout as add)"""
+    _ensure_flusher()
+    with _lock:
+        _pending.extend(rows)
+        _stats['buffered'] += len(rows)
+        overflow = len(_pending) - LOCATION_BUFFER_CAPACITY
+        if overflow > 0:
+            del _pending[:overflow]
+            _stats['dropped'] += overflow
+        full = len(_pending) >= LOCATION_BUFFER_MAX_ROWS
+    if full:
+        _wakeup.set()
+
+
+def _write_fixes(conn, batch):
+    conn.executemany(INSERT_SQL, batch)
+    upsert_latest(conn, batch)
+
+
+def _write_fixes_each(conn, batch) -> List[Tuple]:
+    """
+    Write a batch row by row, skipping rows the database rejects
+
+    Returns:
+        list: The rejected rows. Operational errors (locked, I/O) still fail the whole write.
+    """
+    rejected = []
+    for row in batch:
+        conn.execute("SAVEPOINT fix")
+        try:
+            _write_fixes(conn, [row])
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError, ValueError, TypeError):
+            conn.execute("ROLLBACK TO fix")
+            rejected.append(row)
+        conn.execute("RELEASE fix")
+    return rejected
+
+
+def flush() -> int:
+    """
+    Write every buffered fix in one transaction
+
+    If the group commit fails, the batch is retried row by row so one bad fix
+    cannot block everyone else's; rows the database rejects are dropped and counted.
+
+    Returns:
+        int: Number of fixes written (0 if the write failed; they stay buffered)
+    """
+    with _flush_lock:
+        with _lock:
+            batch = _pending[:]
+            del _pending[:]
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        rejected = []
+        try:
+            ensure_schema()
+            try:
+                run_write(_write_fixes, batch)
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError, ValueError, TypeError) as e:
+                rejected = run_write(_write_fixes_each, batch)
+                print(f"[LOCATION BUFFER] Dropped {len(rejected)} of {len(batch)} fixes the database rejected: {e}")
+        except Exception as e:
+            print(f"[LOCATION BUFFER] Flush of {len(batch)} fixes failed, will retry: {e}")
+            with _lock:
+                # Put the batch back ahead of newer fixes, still bounded by capacity
+                _pending[:0] = batch
+                overflow = len(_pending) - LOCATION_BUFFER_CAPACITY
+                if overflow > 0:
+                    del _pending[:overflow]
+                    _stats['dropped'] += overflow
+            _stats['failed_flushes'] += 1
+            return 0
+
+        _stats['rejected'] += len(rejected)
+        _stats['flushed'] += len(batch) - len(rejected)
+        _stats['batches'] += 1
+        _stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return len(batch) - len(rejected)
+
+
+def _flusher_loop():
+    while True:
+        _wakeup.wait(LOCATION_BUFFER_FLUSH_SECONDS)
+        _wakeup.clear()
+        try:
+            flush()
+        except Exception as e:
+            print(f"[LOCATION BUFFER] Flusher error: {e}")
+
+
+def _ensure_flusher():
+    """Start the flusher thread once per process (workers forked after import get their own)"""
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _flush_lock:
+        if _started_pid == os.getpid():
+            return
+        threading.Thread(target=_flusher_loop, name='location-flusher', daemon=True).start()
+        _started_pid = os.getpid()
+
+
+def get_buffer_stats() -> Dict:
+    with _lock:
+        depth = len(_pending)
+    return dict(_stats, depth=depth)
+
+
+atexit.register(flush)
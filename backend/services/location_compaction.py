@@ -0,0 +1,147 @@
+"""
+Location Compaction
+Background retention job for location_history. For each user-day older than
+LOCATION_RAW_RETENTION_DAYS the full-resolution fixes move into the archive
+and only a Douglas-Peucker simplified track stays in location_history.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict
+
+from database.db import get_db_connection
+from database.migrations import ensure_schema
+from database.writer import run_write
+from services.location_archive import archive_day, encode_day
+from services.trajectory import douglas_peucker
+
+LOCATION_RAW_RETENTION_DAYS = int(os.getenv('LOCATION_RAW_RETENTION_DAYS', 30))
+COMPACTION_TOLERANCE_M = float(os.getenv('LOCATION_COMPACTION_TOLERANCE_M', 25))
+COMPACTION_INTERVAL_SECONDS = int(os.getenv('LOCATION_COMPACTION_INTERVAL_SECONDS', 6 * 3600))
+COMPACTION_MAX_DAYS_PER_RUN = 500  # Bounds one run; the rest is picked up next time
+
+_started_pid = None
+_start_lock = threading.Lock()
+_stats = {'runs': 0, 'days_compacted': 0, 'fixes_archived': 0, 'fixes_kept': 0, 'last_run_seconds': 0.0}
+
+
+def compact_user_day(user_id: str, day: str) -> Dict:
+    """
+    Archive one user-day and keep only its simplified track in location_history
+
+    Reading, encoding and simplification run on a pooled connection in the calling
+    thread; only the archive insert and the delete go through the writer.
+
+    Returns:
+        dict: Counts of archived and kept fixes (both 0 if another worker got there
+              first or the day changed while it was being encoded)
+    """
+    ensure_schema()
+    day_start = datetime.fromisoformat(day)
+    day_end = day_start + timedelta(days=1)
+
+    conn = get_db_connection()
+    try:
+        rows = [dict(row) for row in conn.execute("""
+            SELECT * FROM location_history
+            WHERE user_id = ? AND created_at >= ? AND created_at < ?
+            ORDER BY created_at
+        """, (user_id, day_start, day_end)).fetchall()]
+    finally:
+        conn.close()
+
+    if not rows:
+        return {'archived': 0, 'kept': 0}
+
+    record = encode_day(rows)
+    kept = set(douglas_peucker([r['latitude'] for r in rows], [r['longitude'] for r in rows],
+                               COMPACTION_TOLERANCE_M).tolist())
+    dropped_ids = [row['id'] for i, row in enumerate(rows) if i not in kept]
+    return run_write(_store_compacted, user_id, day_start, day_end, record, dropped_ids)
+
+
+def _store_compacted(conn, user_id: str, day_start: datetime, day_end: datetime, record: Dict,
+                     dropped_ids: list) -> Dict:
+    """Writer operation for compact_user_day: archive the day and trim its history"""
+    count = conn.execute("""
+        SELECT COUNT(*) FROM location_history
+        WHERE user_id = ? AND created_at >= ? AND created_at < ?
+    """, (user_id, day_start, day_end)).fetchone()[0]
+    # Fixes arrived or went since the read; leave the day for the next run
+    if count != record['fix_count']:
+        return {'archived': 0, 'kept': 0}
+    if not archive_day(conn, user_id, day_start.date().isoformat(), record):
+        return {'archived': 0, 'kept': 0}
+
+    conn.executemany("DELETE FROM location_history WHERE id = ?", [(row_id,) for row_id in dropped_ids])
+    return {'archived': record['fix_count'], 'kept': record['fix_count'] - len(dropped_ids)}
+
+
+def run_compaction() -> Dict:
+    """Compact every eligible user-day (up to COMPACTION_MAX_DAYS_PER_RUN)"""
+    started = time.time()
+    cutoff = (datetime.now() - timedelta(days=LOCATION_RAW_RETENTION_DAYS)).date().isoformat()
+
+    conn = get_db_connection()
+    try:
+        ensure_schema()
+        # Archived days keep only their simplified track in history and are skipped
+        candidates = conn.execute("""
+            SELECT DISTINCT h.user_id, date(h.created_at) AS day
+            FROM location_history h
+            WHERE h.created_at < ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM location_archive a
+                  WHERE a.user_id = h.user_id AND a.day = date(h.created_at)
+              )
+            LIMIT ?
+        """, (cutoff, COMPACTION_MAX_DAYS_PER_RUN)).fetchall()
+    finally:
+        conn.close()
+
+    summary = {'days': 0, 'archived': 0, 'kept': 0}
+    for row in candidates:
+        try:
+            result = compact_user_day(row['user_id'], row['day'])
+        except Exception as e:
+            print(f"[COMPACTION] Failed for {row['user_id']} on {row['day']}: {e}")
+            continue
+        if result['archived']:
+            summary['days'] += 1
+            summary['archived'] += result['archived']
+            summary['kept'] += result['kept']
+
+    _stats['runs'] += 1
+    _stats['days_compacted'] += summary['days']
+    _stats['fixes_archived'] += summary['archived']
+    _stats['fixes_kept'] += summary['kept']
+    _stats['last_run_seconds'] = round(time.time() - started, 2)
+    if summary['days']:
+        print(f"[COMPACTION] {summary['days']} user-days: {summary['archived']} fixes archived, "
+              f"{summary['kept']} kept in history")
+    return summary
+
+
+def _compaction_loop():
+    while True:
+        try:
+            run_compaction()
+        except Exception as e:
+            print(f"[COMPACTION] Run failed: {e}")
+        time.sleep(COMPACTION_INTERVAL_SECONDS)
+
+
+def start_compaction_job():
+    """Start the periodic compaction thread once per process"""
+    global _started_pid
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        threading.Thread(target=_compaction_loop, name='location-compaction', daemon=True).start()
+        _started_pid = os.getpid()
+
+
+def get_compaction_stats() -> Dict:
+    return dict(_stats)
@@ -0,0 +1,174 @@
+"""
+Location Pub/Sub
+In-process fan-out of live events (new location fixes, SOS updates) to
+Server-Sent Events subscribers, so followers are pushed each fix as it is
+ingested instead of polling the database.
+
+Channels:
+    location:<user_id>  every fix ingested for a user
+    sos:<sos_id>        SOS session changes (police assigned, resolved)
+
+Fan-out is per process: a subscriber is pushed only the events published by the
+worker serving its stream. Fixes ingested by other workers reach a stream through
+its poll_latest fallback (see stream_events), within one heartbeat plus the
+write-behind flush interval; SOS session changes are caught by the same
+heartbeat's is_active check.
+
+Each open stream holds one server thread (or greenlet) for its whole life, so
+size gthread/gevent workers for the expected number of concurrent followers.
+"""
+
+import json
+import time
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from services.trajectory import to_epoch
+
+# Events buffered per subscriber before the oldest are dropped (slow clients)
+MAX_PENDING_EVENTS = 100
+
+# Idle interval between keep-alive comments, which also bounds how late a stream notices its share ended
+STREAM_HEARTBEAT_SECONDS = 15
+
+_subscribers: Dict[str, set] = {}
+_lock = threading.Lock()
+_stats = {'published': 0, 'delivered': 0, 'dropped': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+class Subscription:
+    """Bounded event queue for one stream, registered on one or more channels."""
+
+    def __init__(self, channels: List[str], max_pending: int = MAX_PENDING_EVENTS):
+        self.channels = channels
+        self.events: queue.Queue = queue.Queue(maxsize=max_pending)
+        # Serializes publishers; the reader only frees space, so drop-oldest then put cannot fail
+        self._put_lock = threading.Lock()
+
+    def put(self, event: Tuple[str, Dict]):
+        with self._put_lock:
+            try:
+                self.events.put_nowait(event)
+                return
+            except queue.Full:
+                pass
+            # Keep the newest fixes: drop the oldest one for a slow client
+            try:
+                self.events.get_nowait()
+                _count(dropped=1)
+            except queue.Empty:
+                pass
+            self.events.put_nowait(event)
+
+    def get(self, timeout: float) -> Optional[Tuple[str, Dict]]:
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        unsubscribe(self)
+
+
+def subscribe(channels: List[str]) -> Subscription:
+    """Register a new subscription on the given channels"""
+    subscription = Subscription(channels)
+    with _lock:
+        for channel in channels:
+            _subscribers.setdefault(channel, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription):
+    with _lock:
+        for channel in subscription.channels:
+            subscribers = _subscribers.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del _subscribers[channel]
+
+
+def publish(channel: str, event: str, data: Dict) -> int:
+    """
+    Push an event to every subscriber of a channel
+
+    Returns:
+        int: Number of subscribers the event was delivered to
+    """
+    with _lock:
+        subscribers = list(_subscribers.get(channel, ()))
+    for subscription in subscribers:
+        subscription.put((event, data))
+    _count(published=1, delivered=len(subscribers))
+    return len(subscribers)
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def stream_events(subscription: Subscription, initial: Iterable[Tuple[str, Dict]],
+                  is_active: Callable[[], bool], heartbeat: float = STREAM_HEARTBEAT_SECONDS,
+                  poll_latest: Optional[Callable[[], Optional[Dict]]] = None) -> Iterator[str]:
+    """
+    Generate an SSE stream: the initial events, then everything published to the
+    subscription until is_active() turns False. Always unsubscribes on exit
+    (including when the client disconnects).
+
+    poll_latest, if given, returns the followed user's latest stored fix. It is
+    checked on every heartbeat and sent as a 'location' event when newer than the
+    last one sent, which delivers fixes ingested by other worker processes.
+    """
+    last_fix_at = None
+
+    def is_newer(data: Dict) -> bool:
+        nonlocal last_fix_at
+        fix_at = to_epoch(data['created_at'])
+        if last_fix_at is not None and fix_at <= last_fix_at:
+            return False
+        last_fix_at = fix_at
+        return True
+
+    try:
+        for event, data in initial:
+            if event == 'location':
+                is_newer(data)
+            yield format_sse(event, data)
+        next_check = time.time() + heartbeat
+        while True:
+            item = subscription.get(timeout=heartbeat)
+            if item is not None:
+                if item[0] == 'location':
+                    is_newer(item[1])
+                yield format_sse(*item)
+            if item is None or time.time() >= next_check:
+                if not is_active():
+                    yield format_sse('end', {})
+                    return
+                next_check = time.time() + heartbeat
+                latest = poll_latest() if poll_latest is not None else None
+                if latest and is_newer(latest):
+                    yield format_sse('location', latest)
+                elif item is None:
+                    yield ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+def get_pubsub_stats() -> Dict:
+    with _lock:
+        channels = len(_subscribers)
+        subscriptions = len({s for subs in _subscribers.values() for s in subs})
+    with _stats_lock:
+        return dict(_stats, channels=channels, subscribers=subscriptions)
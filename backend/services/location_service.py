@@ -4,6 +4,11 @@ Distance calculation and location-based utilities
 """
 
 import math
+from datetime import datetime
+import numpy as np
+
+# Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
@@ -16,8 +21,7 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     Returns:
         float: Distance in kilometers
     """
-    # Earth radius in kilometers
-    R = 6371.0
+    R = EARTH_RADIUS_KM
     
     # Convert to radians
     lat1_rad = math.radians(lat1)
@@ -36,6 +40,52 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     distance = R * c
     return distance
 
+def calculate_distances(origin_lat, origin_lon, lats, lons):
+    """
+    Calculate distances from one origin to many coordinates (vectorized Haversine)
+    
+    Args:
+        origin_lat, origin_lon: Origin coordinate
+        lats, lons: Sequences or arrays of coordinates
+    
+    Returns:
+        numpy.ndarray: Distances in kilometers
+    """
+    lats_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lons_rad = np.radians(np.asarray(lons, dtype=np.float64))
+    origin_lat_rad = math.radians(origin_lat)
+    origin_lon_rad = math.radians(origin_lon)
+    
+    dlat = lats_rad - origin_lat_rad
+    dlon = lons_rad - origin_lon_rad
+    
+    a = np.sin(dlat / 2)**2 + math.cos(origin_lat_rad) * np.cos(lats_rad) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    return EARTH_RADIUS_KM * c
+
+def nearest_indices(distances, k):
+    """
+    Get indices of the k smallest distances, nearest first
+    
+    Uses argpartition so only the selected k are fully sorted.
+    
+    Args:
+        distances: Array of distances
+        k: Number of indices to return
+    
+    Returns:
+        numpy.ndarray: Indices into distances
+    """
+    n = len(distances)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        candidates = np.argpartition(distances, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(distances[candidates], kind='stable')]
+
 def get_nearest_locations(user_lat, user_lon, locations, limit=10):
     """
     Get nearest locations sorted by distance
@@ -48,22 +98,23 @@ def get_nearest_locations(user_lat, user_lon, locations, limit=10):
     Returns:
         list: Sorted locations with distance
     """
-    locations_with_distance = []
+    if not locations:
+        return []
     
-    for location in locations:
-        distance = calculate_distance(
-            user_lat, user_lon,
-            location['latitude'], location['longitude']
-        )
-        
-        location_copy = location.copy()
-        location_copy['distance_km'] = round(distance, 2)
-        locations_with_distance.append(location_copy)
+    distances = calculate_distances(
+        user_lat, user_lon,
+        [location['latitude'] for location in locations],
+        [location['longitude'] for location in locations]
+    )
     
-    # Sort by distance
-    locations_with_distance.sort(key=lambda x: x['distance_km'])
+    # Only the selected locations are copied
+    results = []
+    for i in nearest_indices(distances, limit):
+        location_copy = locations[i].copy()
+        location_copy['distance_km'] = round(float(distances[i]), 2)
+        results.append(location_copy)
     
-    return locations_with_distance[:limit]
+    return results
 
 def is_within_radius(lat1, lon1, lat2, lon2, radius_km):
     """
@@ -128,4 +179,83 @@ def estimate_travel_time(distance_km, mode='driving'):
     time_hours = distance_km / speed
     time_minutes = int(time_hours * 60)
     
-    return time_minutes
\ No newline at end of file
+    return time_minutes
+
+def parse_timestamps(values):
+    """
+    Convert device timestamps to epoch seconds
+    
+    Args:
+        values: Epoch seconds, epoch milliseconds or ISO 8601 strings
+    
+    Returns:
+        numpy.ndarray: Epoch seconds (NaN where a value could not be parsed)
+    """
+    epochs = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            epochs[i] = value
+        elif isinstance(value, str):
+            try:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                epochs[i] = parsed.timestamp()
+            except ValueError:
+                pass
+    # Millisecond clocks are unambiguous: 1e11 seconds is thousands of years away
+    millis = epochs > 1e11
+    epochs[millis] /= 1000.0
+    return epochs
+
+def _as_float(value, missing):
+    """One JSON value as a float: None is missing; strings, booleans and other types are NaN"""
+    if value is None:
+        return missing
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    try:
+        return float(value)
+    except OverflowError:
+        return np.nan
+
+def _float_array(values, missing):
+    """Numeric array from JSON values, element by element (see _as_float)"""
+    return np.array([_as_float(v, missing) for v in values], dtype=np.float64)
+
+def validate_location_batch(lats, lons, accuracies, timestamps, now, max_age_seconds, max_skew_seconds):
+    """
+    Validate a batch of fixes in one vectorized pass
+    
+    Args:
+        lats, lons, accuracies: Sequences of numbers (a missing accuracy counts as 0)
+        timestamps: Epoch seconds (see parse_timestamps)
+        now: Current epoch seconds
+        max_age_seconds: Oldest accepted fix
+        max_skew_seconds: How far into the future a device clock may be
+    
+    Returns:
+        tuple: (valid mask, list of (index, reason) for rejected fixes)
+    """
+    lats = _float_array(lats, missing=np.nan)
+    lons = _float_array(lons, missing=np.nan)
+    accuracies = _float_array(accuracies, missing=0.0)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    
+    checks = [
+        ('invalid latitude', ~(np.abs(lats) <= 90)),
+        ('invalid longitude', ~(np.abs(lons) <= 180)),
+        ('invalid accuracy', ~(accuracies >= 0)),
+        ('invalid timestamp', np.isnan(timestamps)),
+        ('timestamp too old', timestamps < now - max_age_seconds),
+        ('timestamp in the future', timestamps > now + max_skew_seconds),
+    ]
+    
+    valid = np.ones(len(lats), dtype=bool)
+    rejected = []
+    for reason, failed in checks:
+        newly_failed = failed & valid
+        rejected.extend((int(i), reason) for i in np.flatnonzero(newly_failed))
+        valid &= ~failed
+    rejected.sort()
+    return valid, rejected
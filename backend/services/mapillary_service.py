@@ -6,29 +6,77 @@ near a given location using street-level imagery metadata and map features.
 
 import os
 import math
-import requests
-from typing import Optional
-
 import time
+import threading
+
 from typing import Optional, Dict
 
+from services import http_client
+from services.location_service import calculate_distance, calculate_distances
+from services.ttl_cache import TTLCache
+from services.poi_store import load_tile, save_tile, acquire_leases, release_leases, record_failures, poll_fetch
+from services.single_flight import SingleFlight
+
 MAPILLARY_ACCESS_TOKEN = os.getenv('MAPILLARY_ACCESS_TOKEN', '')
 MAPILLARY_BASE_URL = "https://graph.mapillary.com"
 
-# Simple grid-based cache to avoid hitting Overpass too hard
-# Key: (amenity, grid_lat, grid_lng), Value: {'timestamp': time, 'data': [...]}
-_poi_cache: Dict = {}
-CACHE_TTL = 300 # 5 minutes
+# POIs are fetched and cached per fixed map tile (~11km), independent of the search radius
+TILE_SIZE_DEG = 0.1
+
+# Tile cache to avoid hitting Overpass too hard
+# Key: (source, amenity, tile_key), Value: [...POIs without distance...]
+# Backed by the on-disk poi_store so entries survive restarts and are shared across workers
+CACHE_TTL = 300 # 5 minutes (default for amenities not listed below)
+AMENITY_CACHE_TTLS = {
+    "police": 3600,    # Stations rarely move
+    "hospital": 3600,
+    "hotel": 1800,
+}
+EMPTY_RESULT_TTL = 120   # Empty answers are re-checked sooner
+FAILURE_TTL = 30         # Back off from a failing upstream briefly (cached as None, empty answers as [])
+POI_CACHE_MAX_ENTRIES = int(os.getenv('POI_CACHE_MAX_ENTRIES', 2048))
+
+_poi_cache = TTLCache(
+    'poi',
+    max_entries=POI_CACHE_MAX_ENTRIES,
+    default_ttl=CACHE_TTL,
+    negative_ttl=FAILURE_TTL,
+    ttl_for=lambda key: AMENITY_CACHE_TTLS.get(key[1], CACHE_TTL),
+)
+
+
+class UpstreamUnavailable(Exception):
+    """A POI source failed for tiles that were not cached"""
+
+
+# Concurrent misses for the same (source, amenity, tile) share one upstream request
+_inflight = SingleFlight('poi')
+FETCH_BUDGET_SECONDS = 30          # Upstream timeout (20s) plus connection retries; also the lease TTL
+LEASE_WAIT_SECONDS = 25            # How long a leader polls for another worker's fetch
+INFLIGHT_WAIT_SECONDS = LEASE_WAIT_SECONDS + FETCH_BUDGET_SECONDS + 5   # Leader's worst case plus margin
+LEASE_POLL_SECONDS = 0.2
+
+# Cache keys with a background refresh in flight
+_refreshing = set()
+_refresh_lock = threading.Lock()
 
 
 def haversine(lat1, lon1, lat2, lon2):
     """Calculate distance in km between two lat/lon points."""
-    R = 6371
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2)**2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return calculate_distance(lat1, lon1, lat2, lon2)
+
+
+def _with_distances(lat: float, lon: float, items: list) -> list:
+    """Return items with 'distance_km' from (lat, lon) set in one vectorized pass, nearest first."""
+    if not items:
+        return []
+    distances = calculate_distances(lat, lon, [i["lat"] for i in items], [i["lng"] for i in items])
+    results = []
+    for idx in distances.argsort(kind="stable"):
+        item = items[idx]
+        item["distance_km"] = round(float(distances[idx]), 2)
+        results.append(item)
+    return results
 
 
 def get_nearby_images(lat: float, lon: float, radius: int = 500, limit: int = 10) -> list:
@@ -44,7 +92,7 @@ def get_nearby_images(lat: float, lon: float, radius: int = 500, limit: int = 10
             "bbox": _bounding_box(lat, lon, radius),
             "limit": limit,
         }
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             return data.get("data", [])
@@ -56,10 +104,285 @@ def get_nearby_images(lat: float, lon: float, radius: int = 500, limit: int = 10
         return []
 
 
-def search_pois_mapillary(lat: float, lon: float, amenity: str, radius_m: int = 5000) -> list:
+def tile_for(lat: float, lon: float) -> tuple:
+    """Fixed map tile (row, col) containing a coordinate."""
+    return (math.floor(lat / TILE_SIZE_DEG), math.floor(lon / TILE_SIZE_DEG))
+
+
+def _tile_key(tile: tuple) -> str:
+    # Tile size is part of the key so entries from a different tiling never collide
+    return f"{TILE_SIZE_DEG}:{tile[0]}:{tile[1]}"
+
+
+def _tile_bounds(tile: tuple) -> tuple:
+    """(south, west, north, east) of a tile."""
+    south = tile[0] * TILE_SIZE_DEG
+    west = tile[1] * TILE_SIZE_DEG
+    return (round(south, 6), round(west, 6), round(south + TILE_SIZE_DEG, 6), round(west + TILE_SIZE_DEG, 6))
+
+
+def _covering_tiles(lat: float, lon: float, radius_m: int) -> list:
+    """Tiles that intersect the circle of radius_m around (lat, lon)."""
+    delta_lat = radius_m / 111320
+    delta_lon = radius_m / (111320 * math.cos(math.radians(lat)))
+    min_i, min_j = tile_for(lat - delta_lat, lon - delta_lon)
+    max_i, max_j = tile_for(lat + delta_lat, lon + delta_lon)
+
+    tiles = []
+    radius_km = radius_m / 1000
+    for i in range(min_i, max_i + 1):
+        for j in range(min_j, max_j + 1):
+            # Skip corner tiles whose closest point is outside the circle
+            south, west, north, east = _tile_bounds((i, j))
+            closest_lat = min(max(lat, south), north)
+            closest_lon = min(max(lon, west), east)
+            if calculate_distance(lat, lon, closest_lat, closest_lon) <= radius_km:
+                tiles.append((i, j))
+    return tiles
+
+
+def _lookup_tiles(source: str, amenities: list, tiles: list, fetch_tiles) -> tuple:
+    """
+    Two-tier cached lookup of a set of tiles for one or more amenities: in-process
+    LRU first, then the shared on-disk store, then a single upstream fetch for every
+    (amenity, tile) still missing. Stale disk entries are served immediately while a
+    background thread refreshes them.
+
+    fetch_tiles({amenity: [tiles]}) returns {amenity: {tile: [POIs without distances]}},
+    or None if the upstream failed.
+    Returns ({amenity: combined cached POIs}, set of (amenity, tile) the upstream
+    failed for, now or within FAILURE_TTL).
+    """
+    pois = {amenity: [] for amenity in amenities}
+    failed = set()
+    missing = {}
+    stale = {}
+    for amenity in amenities:
+        for tile in tiles:
+            cache_key = (source, amenity, _tile_key(tile))
+            found, cached = _poi_cache.get(cache_key)
+            if found:
+                if cached is None:
+                    failed.add((amenity, tile))
+                else:
+                    pois[amenity].extend(cached)
+                continue
+
+            stored = load_tile(source, amenity, cache_key[2])
+            if not stored:
+                missing.setdefault(amenity, []).append(tile)
+                continue
+
+            tile_pois, age = stored
+            # Empty tiles are re-checked sooner, on disk as in memory
+            fresh_for = AMENITY_CACHE_TTLS.get(amenity, CACHE_TTL) if tile_pois else EMPTY_RESULT_TTL
+            if age < fresh_for:
+                if tile_pois:
+                    _poi_cache.set(cache_key, tile_pois, ttl=fresh_for - age)
+                else:
+                    _poi_cache.set_negative(cache_key, [], ttl=fresh_for - age)
+            else:
+                # Keep serving the stale copy from memory until the refresh lands
+                _poi_cache.set(cache_key, tile_pois, ttl=FAILURE_TTL)
+                stale.setdefault(amenity, []).append(tile)
+            pois[amenity].extend(tile_pois)
+
+    for amenity in amenities:
+        n_missing = len(missing.get(amenity, []))
+        n_stale = len(stale.get(amenity, []))
+        print(f"[CACHE] {source} {amenity}: {len(tiles) - n_missing}/{len(tiles)} tiles cached"
+              + (f", {n_stale} stale (refreshing)" if n_stale else ""))
+
+    if stale:
+        _refresh_in_background(source, stale, fetch_tiles)
+    if missing:
+        fetched, fetch_failed = _fetch_coalesced(source, missing, fetch_tiles)
+        failed |= fetch_failed
+        for amenity, amenity_tiles in missing.items():
+            for tile in amenity_tiles:
+                pois[amenity].extend(fetched.get(amenity, {}).get(tile, []))
+    return pois, failed
+
+
+def _fetch_coalesced(source: str, missing: dict, fetch_tiles) -> tuple:
+    """
+    Fetch missing tiles with concurrent identical lookups coalesced. Within this
+    process, the first caller for an (amenity, tile) leads and later callers wait on
+    it. Across workers, a lease in the POI store lets one worker fetch while the
+    others wait for the tile to appear on disk.
+
+    Returns ({amenity: {tile: POIs}} for every requested pair that resolved,
+    set of (amenity, tile) that failed or timed out).
+    """
+    results = {}
+    failed = set()
+    led = {}
+    following = []
+    for amenity, tiles in missing.items():
+        for tile in tiles:
+            key = (source, amenity, _tile_key(tile))
+            is_leader, call = _inflight.claim(key)
+            if is_leader:
+                led.setdefault(amenity, []).append(tile)
+            else:
+                following.append((amenity, tile, call))
+
+    if led:
+        to_fetch = {}
+        try:
+            to_fetch = _wait_for_other_workers(source, led, results, failed)
+            if to_fetch:
+                fetched = _fetch_and_store(source, to_fetch, fetch_tiles)
+                if fetched is None:
+                    for amenity, tiles in to_fetch.items():
+                        for tile in tiles:
+                            _poi_cache.set_negative((source, amenity, _tile_key(tile)))
+                            failed.add((amenity, tile))
+                    fetched = {}
+                for amenity, tiles in fetched.items():
+                    for tile, tile_pois in tiles.items():
+                        results.setdefault(amenity, {})[tile] = tile_pois
+        finally:
+            if to_fetch:
+                release_leases(source, [(a, _tile_key(t)) for a, ts in to_fetch.items() for t in ts])
+            for amenity, tiles in led.items():
+                for tile in tiles:
+                    key = (source, amenity, _tile_key(tile))
+                    if tile in results.get(amenity, {}):
+                        _inflight.complete(key, results[amenity][tile])
+                    else:
+                        _inflight.complete(key, error=UpstreamUnavailable(f"{source} fetch failed for {amenity} tile {tile}"))
+
+    for amenity, tile, call in following:
+        try:
+            results.setdefault(amenity, {})[tile] = call.wait(INFLIGHT_WAIT_SECONDS)
+        except Exception as e:
+            print(f"[SINGLE FLIGHT] No result for {source} {amenity} tile {tile}: {e}")
+            failed.add((amenity, tile))
+    return results, failed
+
+
+def _wait_for_other_workers(source: str, led: dict, results: dict, failed: set) -> dict:
+    """
+    Take cross-worker leases on the tiles this process leads. Tiles leased by another
+    worker are polled from the store until they land, the fetch is marked failed, or
+    the lease is dropped or runs out; they are put into results or failed.
+    Returns the tiles this worker still has to fetch itself.
+    """
+    keys = [(amenity, _tile_key(tile)) for amenity, tiles in led.items() for tile in tiles]
+    # Anything written since the current leases could have been taken belongs to this round
+    since = time.time() - FETCH_BUDGET_SECONDS
+    held = set(acquire_leases(source, keys, FETCH_BUDGET_SECONDS))
+
+    to_fetch = {}
+    waiting = []
+    for amenity, tiles in led.items():
+        for tile in tiles:
+            if (amenity, _tile_key(tile)) in held:
+                to_fetch.setdefault(amenity, []).append(tile)
+            else:
+                waiting.append((amenity, tile))
+
+    deadline = time.time() + LEASE_WAIT_SECONDS
+    while waiting and time.time() < deadline:
+        time.sleep(LEASE_POLL_SECONDS)
+        still_waiting = []
+        for amenity, tile in waiting:
+            cache_key = (source, amenity, _tile_key(tile))
+            state, tile_pois = poll_fetch(source, amenity, cache_key[2], since)
+            if state == 'ready':
+                if tile_pois:
+                    _poi_cache.set(cache_key, tile_pois)
+                else:
+                    _poi_cache.set_negative(cache_key, [], ttl=EMPTY_RESULT_TTL)
+                results.setdefault(amenity, {})[tile] = tile_pois
+                _inflight.record_remote()
+            elif state == 'failed':
+                # Same back-off as a failure in this worker
+                _poi_cache.set_negative(cache_key)
+                failed.add((amenity, tile))
+            elif state == 'abandoned':
+                to_fetch.setdefault(amenity, []).append(tile)
+            else:
+                still_waiting.append((amenity, tile))
+        waiting = still_waiting
+
+    # The other worker did not deliver in time, fetch what is left ourselves
+    for amenity, tile in waiting:
+        to_fetch.setdefault(amenity, []).append(tile)
+    return to_fetch
+
+
+def _fetch_and_store(source: str, wanted: dict, fetch_tiles) -> Optional[dict]:
+    """
+    Fetch tiles upstream and write them to both cache tiers. On failure, record it in
+    the store for workers waiting on our leases and return None.
+    """
+    fetched = fetch_tiles(wanted)
+    if fetched is None:
+        record_failures(source, [(amenity, _tile_key(tile)) for amenity, tiles in wanted.items() for tile in tiles])
+        return None
+
+    for amenity, tiles in wanted.items():
+        for tile in tiles:
+            tile_pois = fetched.get(amenity, {}).get(tile, [])
+            cache_key = (source, amenity, _tile_key(tile))
+            save_tile(source, amenity, cache_key[2], tile_pois)
+            if tile_pois:
+                _poi_cache.set(cache_key, tile_pois)
+            else:
+                _poi_cache.set_negative(cache_key, [], ttl=EMPTY_RESULT_TTL)
+    return fetched
+
+
+def _refresh_in_background(source: str, stale: dict, fetch_tiles):
+    with _refresh_lock:
+        wanted = {}
+        for amenity, tiles in stale.items():
+            tiles = [t for t in tiles if (source, amenity, t) not in _refreshing]
+            if tiles:
+                wanted[amenity] = tiles
+                _refreshing.update((source, amenity, t) for t in tiles)
+        if not wanted:
+            return
+
+    def run():
+        try:
+            _fetch_and_store(source, wanted, fetch_tiles)
+        finally:
+            with _refresh_lock:
+                for amenity, tiles in wanted.items():
+                    _refreshing.difference_update((source, amenity, t) for t in tiles)
+
+    threading.Thread(target=run, name=f"poi-refresh-{source}", daemon=True).start()
+
+
+def _bucket_by_tile(pois: list, tiles: list) -> dict:
+    """Split POIs into the requested tiles by coordinate, dropping any outside them."""
+    buckets = {tile: [] for tile in tiles}
+    for poi in pois:
+        tile = tile_for(poi["lat"], poi["lng"])
+        if tile in buckets:
+            buckets[tile].append(poi)
+    return buckets
+
+
+def _within_radius(lat: float, lon: float, pois: list, radius_m: int) -> list:
+    """Copy POIs within radius_m, annotated with distance and nearest first."""
+    # Callers annotate results, so hand out copies and keep the cached entries pristine
+    results = _with_distances(lat, lon, [poi.copy() for poi in pois])
+    radius_km = radius_m / 1000
+    return [poi for poi in results if poi["distance_km"] <= radius_km]
+
+
+def search_pois_mapillary(lat: float, lon: float, amenity: str, radius_m: int = 5000,
+                          raise_on_failure: bool = False) -> list:
     """
     Search for POIs using Mapillary Graph API v4 map_features.
     Layers: point.amenity.police, point.amenity.hospital, etc.
+
+    Tiles the API failed for are left out; with raise_on_failure, UpstreamUnavailable
+    is raised instead so callers can report the source as missing.
     """
     if not MAPILLARY_ACCESS_TOKEN:
         return []
@@ -75,19 +398,28 @@ def search_pois_mapillary(lat: float, lon: float, amenity: str, radius_m: int =
     if not layer:
         return []
 
-    url = f"{MAPILLARY_BASE_URL}/map_features"
-    params = {
-        "access_token": MAPILLARY_ACCESS_TOKEN,
-        "layers": layer,
-        "bbox": _bounding_box(lat, lon, radius_m),
-        "fields": "id,geometry,properties"
-    }
-
-    try:
-        response = requests.get(url, params=params, timeout=15)
-        if response.status_code == 200:
+    def fetch_tiles(wanted):
+        # map_features takes a single bbox, so fetch the rectangle spanning the tiles and split it
+        tiles = wanted[amenity]
+        bounds = [_tile_bounds(t) for t in tiles]
+        bbox = (
+            f"{min(b[1] for b in bounds)},{min(b[0] for b in bounds)},"
+            f"{max(b[3] for b in bounds)},{max(b[2] for b in bounds)}"
+        )
+        url = f"{MAPILLARY_BASE_URL}/map_features"
+        params = {
+            "access_token": MAPILLARY_ACCESS_TOKEN,
+            "layers": layer,
+            "bbox": bbox,
+            "fields": "id,geometry,properties"
+        }
+        try:
+            response = http_client.get(url, params=params, timeout=15)
+            if response.status_code != 200:
+                print(f"Mapillary POI search error: {response.status_code}")
+                return None
             data = response.json().get("data", [])
-            print(f"[MAPILLARY] Found {len(data)} features for {amenity}")
+            print(f"[MAPILLARY] Found {len(data)} features for {amenity} in {len(tiles)} tiles")
             results = []
             for feat in data:
                 props = feat.get("properties", {})
@@ -95,132 +427,167 @@ def search_pois_mapillary(lat: float, lon: float, amenity: str, radius_m: int =
                 
                 # Geometries in GeoJSON are [lng, lat]
                 elem_lon, elem_lat = geom[0], geom[1]
-                distance = haversine(lat, lon, elem_lat, elem_lon)
                 
                 results.append({
                     "id": feat.get("id"),
                     "name": props.get("name") or f"{amenity.capitalize()} (Mapillary)",
                     "lat": elem_lat,
                     "lng": elem_lon,
-                    "distance_km": round(distance, 2),
                     "address": props.get("address", "Address verified via Mapillary imagery"),
                     "source": "Mapillary Graph API"
                 })
-            return results
-    except Exception as e:
-        print(f"Mapillary POI search error: {e}")
-    return []
+            return {amenity: _bucket_by_tile(results, tiles)}
+        except Exception as e:
+            print(f"Mapillary POI search error: {e}")
+            return None
 
+    pois, failed = _lookup_tiles("mapillary", [amenity], _covering_tiles(lat, lon, radius_m), fetch_tiles)
+    if failed and raise_on_failure:
+        raise UpstreamUnavailable(f"Mapillary failed for {len(failed)} {amenity} tiles")
+    return _within_radius(lat, lon, pois[amenity], radius_m)
 
-def search_pois_overpass(lat: float, lon: float, amenity: str, radius: int = 5000) -> list:
+
+def search_pois_overpass(lat: float, lon: float, amenity: str, radius: int = 5000,
+                         raise_on_failure: bool = False) -> list:
     """
     Use OpenStreetMap Overpass API (free, no key) to find real POIs near a location.
     This is the best free alternative since Mapillary is for imagery, not POI search.
     Supported amenity values: 'police', 'hospital', 'hotel', 'lodging'
+
+    POIs are fetched and cached per fixed map tile, so any centre and radius is
+    answered from the covering tiles and then filtered by distance. Tiles Overpass
+    failed for are left out; with raise_on_failure, UpstreamUnavailable is raised
+    instead.
     """
-    # 1. Check cache first
-    # Round to 0.01 (~1.1km) to group nearby requests
-    grid_lat = round(lat, 2)
-    grid_lng = round(lon, 2)
-    cache_key = (amenity, grid_lat, grid_lng, radius)
-    
-    now = time.time()
-    if cache_key in _poi_cache:
-        cached = _poi_cache[cache_key]
-        if now - cached['timestamp'] < CACHE_TTL:
-            print(f"[CACHE] Returning cached {amenity} for grid {grid_lat},{grid_lng}")
-            # IMPORTANT: Distances must be recalculated for the current exact location!
-            results = []
-            for item in cached['data']:
-                item_copy = item.copy()
-                item_copy['distance_km'] = round(haversine(lat, lon, item['lat'], item['lng']), 2)
-                results.append(item_copy)
-            
-            # Sort by new recalculated distance
-            results.sort(key=lambda x: x["distance_km"])
-            return results
+    return search_pois_overpass_multi(lat, lon, [amenity], radius, raise_on_failure)[amenity]
 
-    overpass_url = "https://overpass-api.de/api/interpreter"
 
-    # Map amenity types
+def search_pois_overpass_multi(lat: float, lon: float, amenities: list, radius: int = 5000,
+                               raise_on_failure: bool = False) -> dict:
+    """
+    Look up several amenity classes at once. Every tile missing for any of them is
+    fetched in a single Overpass query, and results are split by tag into the
+    per-amenity cache entries.
+
+    Returns:
+        dict: {amenity: [POIs nearest first]}
+
+    Raises:
+        UpstreamUnavailable: With raise_on_failure, if Overpass failed for any tile
+    """
+    pois, failed = _lookup_tiles("overpass", list(amenities), _covering_tiles(lat, lon, radius), _fetch_overpass_tiles)
+    if failed and raise_on_failure:
+        raise UpstreamUnavailable(f"Overpass failed for {len(failed)} tiles of {', '.join(amenities)}")
+    # IMPORTANT: Distances must be recalculated for the current exact location!
+    return {amenity: _within_radius(lat, lon, pois[amenity], radius) for amenity in amenities}
+
+
+def _overpass_filters(amenity: str) -> list:
+    """(element type, tag key, tag value) statements that select an amenity class."""
     if amenity == "hotel":
-        query_filter = f'(node["tourism"="hotel"](around:{radius},{lat},{lon}); way["tourism"="hotel"](around:{radius},{lat},{lon}););'
-    elif amenity == "police":
-        query_filter = f'(node["amenity"="police"](around:{radius},{lat},{lon}); way["amenity"="police"](around:{radius},{lat},{lon}););'
-    elif amenity == "hospital":
-        query_filter = f'(node["amenity"="hospital"](around:{radius},{lat},{lon}); node["amenity"="clinic"](around:{radius},{lat},{lon}); node["amenity"="doctors"](around:{radius},{lat},{lon}); node["amenity"="health_post"](around:{radius},{lat},{lon}); way["amenity"="hospital"](around:{radius},{lat},{lon}););'
-    else:
-        query_filter = f'node["amenity"="{amenity}"](around:{radius},{lat},{lon});'
+        return [("node", "tourism", "hotel"), ("way", "tourism", "hotel")]
+    if amenity == "police":
+        return [("node", "amenity", "police"), ("way", "amenity", "police")]
+    if amenity == "hospital":
+        return [("node", "amenity", "hospital"), ("node", "amenity", "clinic"), ("node", "amenity", "doctors"),
+                ("node", "amenity", "health_post"), ("way", "amenity", "hospital")]
+    return [("node", "amenity", amenity)]
+
+
+def _matches_amenity(element: dict, amenity: str) -> bool:
+    tags = element.get("tags", {})
+    return any(
+        element.get("type") == elem_type and tags.get(key) == value
+        for elem_type, key, value in _overpass_filters(amenity)
+    )
+
+
+def _fetch_overpass_tiles(wanted: dict) -> Optional[dict]:
+    """
+    Fetch tiles for one or more amenities in one Overpass request
+    (one bbox statement per amenity filter and tile).
+    Returns {amenity: {tile: [POIs without distances]}}, or None on failure.
+    """
+    overpass_url = "https://overpass-api.de/api/interpreter"
+
+    statements = []
+    for amenity, tiles in wanted.items():
+        for tile in tiles:
+            south, west, north, east = _tile_bounds(tile)
+            for elem_type, key, value in _overpass_filters(amenity):
+                statements.append(f'{elem_type}["{key}"="{value}"]({south},{west},{north},{east});')
 
     query = f"""
     [out:json][timeout:25];
-    {query_filter}
+    ({" ".join(statements)});
     out body center;
     """
 
+    label = "+".join(wanted)
     try:
-        response = requests.post(overpass_url, data={"data": query}, timeout=20)
-        if response.status_code == 200:
-            data = response.json()
-            elements = data.get("elements", [])
-            print(f"[OVERPASS] Found {len(elements)} elements for {amenity}")
-            results = []
-            for element in data.get("elements", []):
-                tags = element.get("tags", {})
-                name = tags.get("name") or tags.get("name:en") or tags.get("name:ta")
-                if not name:
-                    continue
-
-                # Get coordinates
-                if element["type"] == "node":
-                    elem_lat = element["lat"]
-                    elem_lon = element["lon"]
-                elif "center" in element:
-                    elem_lat = element["center"]["lat"]
-                    elem_lon = element["center"]["lon"]
-                else:
-                    continue
-
-                distance = haversine(lat, lon, elem_lat, elem_lon)
-
-                result = {
-                    "id": str(element["id"]),
-                    "name": name,
-                    "lat": elem_lat,
-                    "lng": elem_lon,
-                    "distance_km": round(distance, 2),
-                    "address": _build_address(tags),
-                    "phone": tags.get("phone") or tags.get("contact:phone"),
-                    "source": "OpenStreetMap",
-                    "mapillary_images": [],  # Can be enriched later
-                }
-
-                # Extra fields by type
-                if amenity == "hospital":
-                    result["emergency_phone"] = tags.get("emergency:phone") or tags.get("phone")
-                    result["emergency"] = tags.get("emergency", "yes")
-                    result["opening_hours"] = tags.get("opening_hours", "24/7")
-                if amenity == "hotel":
-                    result["stars"] = tags.get("stars")
-                    result["website"] = tags.get("website") or tags.get("contact:website")
-                    result["rating"] = float(tags.get("rating", 0)) if tags.get("rating") else None
-
-                results.append(result)
-
-            # Sort by distance
-            results.sort(key=lambda x: x["distance_km"])
-            
-            # Store in cache
-            _poi_cache[cache_key] = {
-                'timestamp': now,
-                'data': results
-            }
-            return results
+        response = http_client.post(overpass_url, data={"data": query}, timeout=20)
+        if response.status_code != 200:
+            print(f"Overpass API error for {label}: {response.status_code}")
+            return None
+
+        data = response.json()
+        elements = data.get("elements", [])
+        print(f"[OVERPASS] Found {len(elements)} elements for {label}")
+
+        # Split by tag: an element belongs to every requested amenity whose filter it matches
+        results = {amenity: [] for amenity in wanted}
+        for element in elements:
+            for amenity in wanted:
+                if _matches_amenity(element, amenity):
+                    result = _parse_overpass_element(element, amenity)
+                    if result:
+                        results[amenity].append(result)
+        return {amenity: _bucket_by_tile(results[amenity], tiles) for amenity, tiles in wanted.items()}
 
     except Exception as e:
-        print(f"Overpass API exception for {amenity}: {e}")
+        print(f"Overpass API exception for {label}: {e}")
+        return None
+
+
+def _parse_overpass_element(element: dict, amenity: str) -> Optional[dict]:
+    """Convert one Overpass element into our POI dict (None if unnamed or without coordinates)."""
+    tags = element.get("tags", {})
+    name = tags.get("name") or tags.get("name:en") or tags.get("name:ta")
+    if not name:
+        return None
+
+    # Get coordinates
+    if element["type"] == "node":
+        elem_lat = element["lat"]
+        elem_lon = element["lon"]
+    elif "center" in element:
+        elem_lat = element["center"]["lat"]
+        elem_lon = element["center"]["lon"]
+    else:
+        return None
+
+    result = {
+        "id": str(element["id"]),
+        "name": name,
+        "lat": elem_lat,
+        "lng": elem_lon,
+        "address": _build_address(tags),
+        "phone": tags.get("phone") or tags.get("contact:phone"),
+        "source": "OpenStreetMap",
+        "mapillary_images": [],  # Can be enriched later
+    }
+
+    # Extra fields by type
+    if amenity == "hospital":
+        result["emergency_phone"] = tags.get("emergency:phone") or tags.get("phone")
+        result["emergency"] = tags.get("emergency", "yes")
+        result["opening_hours"] = tags.get("opening_hours", "24/7")
+    if amenity == "hotel":
+        result["stars"] = tags.get("stars")
+        result["website"] = tags.get("website") or tags.get("contact:website")
+        result["rating"] = float(tags.get("rating", 0)) if tags.get("rating") else None
 
-    return []
+    return result
 
 
 def get_mapillary_street_view(lat: float, lon: float, radius: int = 200) -> dict:
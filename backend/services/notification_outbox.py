@@ -0,0 +1,222 @@
+"""
+Notification Outbox
+Durable queue for SMS and email. Request handlers enqueue a row and return;
+background dispatcher threads drain the table with retries and backoff.
+
+Delivery is at-least-once: a row being sent is leased, and if its worker dies
+mid-send the lease expires and another worker picks the row up again.
+"""
+
+import os
+import time
+import uuid
+import random
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from database.db import get_db_connection
+from database.migrations import ensure_schema
+from database.writer import run_write
+
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', 4))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 6))
+OUTBOX_BACKOFF_BASE = float(os.getenv('OUTBOX_BACKOFF_BASE_SECONDS', 2))
+OUTBOX_BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX_SECONDS', 300))
+OUTBOX_LEASE_SECONDS = float(os.getenv('OUTBOX_LEASE_SECONDS', 60))
+OUTBOX_IDLE_POLL_SECONDS = 1.0
+
+# Maximum concurrent sends per provider in this process
+PROVIDER_CONCURRENCY = {
+    'sms': int(os.getenv('OUTBOX_SMS_CONCURRENCY', 4)),
+    'email': int(os.getenv('OUTBOX_EMAIL_CONCURRENCY', 2)),
+}
+
+_provider_slots = {channel: threading.BoundedSemaphore(n) for channel, n in PROVIDER_CONCURRENCY.items()}
+_wakeup = threading.Event()
+_started_pid = None
+_start_lock = threading.Lock()
+
+
+# Next due row for a channel: pending, or sending with an expired lease
+DUE_SQL = """
+    SELECT {columns} FROM notification_outbox
+    WHERE channel = ?
+      AND ((status = 'pending' AND next_attempt_at <= ?)
+           OR (status = 'sending' AND locked_until < ?))
+    ORDER BY next_attempt_at
+    LIMIT 1
+"""
+
+
+def _get_connection():
+    ensure_schema()
+    return get_db_connection()
+
+
+def _enqueue(channel: str, recipient: str, body: str, subject: Optional[str] = None,
+             idempotency_key: Optional[str] = None) -> str:
+    """Insert a notification unless one with the same idempotency key already exists"""
+    # Workers forked after import have no dispatcher until something is queued
+    start_dispatcher()
+    idempotency_key = idempotency_key or str(uuid.uuid4())
+    ensure_schema()
+    # Waits for the commit: a queued notification must survive a crash right after
+    run_write(lambda conn: conn.execute("""
+        INSERT OR IGNORE INTO notification_outbox
+        (id, idempotency_key, channel, recipient, subject, body, status, next_attempt_at, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?)
+    """, (str(uuid.uuid4()), idempotency_key, channel, recipient, subject, body, time.time(), datetime.now())))
+    _wakeup.set()
+    return idempotency_key
+
+
+def enqueue_sms(to_phone: str, message: str, idempotency_key: Optional[str] = None) -> str:
+    """
+    Queue an SMS for delivery
+
+    Args:
+        to_phone: Recipient phone number
+        message: SMS content
+        idempotency_key: Repeated enqueues with the same key are ignored
+
+    Returns:
+        str: The idempotency key of the queued message
+    """
+    return _enqueue('sms', to_phone, message, idempotency_key=idempotency_key)
+
+
+def enqueue_email(to_email: str, subject: str, content: str, idempotency_key: Optional[str] = None) -> str:
+    """Queue an email for delivery (see enqueue_sms)"""
+    return _enqueue('email', to_email, content, subject=subject, idempotency_key=idempotency_key)
+
+
+def _claim(channel: str, worker_id: str) -> Optional[Dict]:
+    """Lease the next due row for a channel (pending, or sending with an expired lease)"""
+    # Idle dispatchers poll every second; check with a plain read so an empty queue
+    # never costs a write transaction on the shared writer
+    conn = _get_connection()
+    try:
+        now = time.time()
+        due = conn.execute(DUE_SQL.format(columns='1'), (channel, now, now)).fetchone()
+    finally:
+        conn.close()
+    if not due:
+        return None
+
+    def claim(conn):
+        now = time.time()
+        row = conn.execute(DUE_SQL.format(columns='*'), (channel, now, now)).fetchone()
+        if not row:
+            return None
+        conn.execute("""
+            UPDATE notification_outbox
+            SET status = 'sending', attempts = attempts + 1, locked_by = ?, locked_until = ?
+            WHERE id = ?
+        """, (worker_id, now + OUTBOX_LEASE_SECONDS, row['id']))
+        claimed = dict(row)
+        claimed['attempts'] += 1
+        return claimed
+
+    # Select and lease in one write transaction, so two dispatchers never claim the same row
+    return run_write(claim)
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(OUTBOX_BACKOFF_BASE * (2 ** (attempts - 1)), OUTBOX_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _deliver(item: Dict) -> bool:
+    from services.notification_service import send_sms, send_email
+
+    if item['channel'] == 'sms':
+        return send_sms(item['recipient'], item['body'])
+    if item['channel'] == 'email':
+        return send_email(item['recipient'], item['subject'], item['body'])
+    raise ValueError(f"Unknown channel {item['channel']}")
+
+
+def _finish(item: Dict, ok: bool, error: Optional[str] = None):
+    run_write(_record_outcome, item, ok, error)
+
+
+def _record_outcome(conn, item: Dict, ok: bool, error: Optional[str]):
+    if ok:
+        conn.execute("""
+            UPDATE notification_outbox
+            SET status = 'sent', sent_at = ?, locked_by = NULL, locked_until = NULL, last_error = NULL
+            WHERE id = ?
+        """, (datetime.now(), item['id']))
+    elif item['attempts'] >= OUTBOX_MAX_ATTEMPTS:
+        conn.execute("""
+            UPDATE notification_outbox
+            SET status = 'failed', locked_by = NULL, locked_until = NULL, last_error = ?
+            WHERE id = ?
+        """, (error, item['id']))
+        print(f"[OUTBOX] Giving up on {item['channel']} to {item['recipient']} after {item['attempts']} attempts")
+    else:
+        conn.execute("""
+            UPDATE notification_outbox
+            SET status = 'pending', next_attempt_at = ?, locked_by = NULL, locked_until = NULL, last_error = ?
+            WHERE id = ?
+        """, (time.time() + _backoff(item['attempts']), error, item['id']))
+
+
+def _dispatch_one(channel: str, worker_id: str) -> bool:
+    """Send one due notification on a channel if a provider slot is free. Returns True if work was done."""
+    slot = _provider_slots[channel]
+    if not slot.acquire(blocking=False):
+        return False
+    try:
+        item = _claim(channel, worker_id)
+        if not item:
+            return False
+        try:
+            ok = _deliver(item)
+            error = None if ok else 'Provider reported failure'
+        except Exception as e:
+            ok, error = False, str(e)
+        _finish(item, ok, error)
+        return True
+    finally:
+        slot.release()
+
+
+def _worker_loop(worker_id: str):
+    while True:
+        try:
+            # Clear before claiming: a wakeup set while we look for work is not lost
+            _wakeup.clear()
+            worked = False
+            for channel in PROVIDER_CONCURRENCY:
+                worked = _dispatch_one(channel, worker_id) or worked
+            if not worked:
+                _wakeup.wait(OUTBOX_IDLE_POLL_SECONDS)
+        except Exception as e:
+            print(f"[OUTBOX] Dispatcher {worker_id} error: {e}")
+            time.sleep(OUTBOX_IDLE_POLL_SECONDS)
+
+
+def start_dispatcher(workers: int = OUTBOX_WORKERS):
+    """Start the dispatcher threads once per process (safe to call repeatedly and after fork)"""
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        _get_connection().close()
+        for i in range(workers):
+            worker_id = f"{os.getpid()}-{i}"
+            threading.Thread(target=_worker_loop, args=(worker_id,), name=f"outbox-{i}", daemon=True).start()
+        _started_pid = os.getpid()
+        print(f"[OUTBOX] Started {workers} dispatcher threads")
+
+
+def get_outbox_stats() -> Dict:
+    """Queue depth by status"""
+    conn = _get_connection()
+    rows = conn.execute("SELECT status, COUNT(*) AS n FROM notification_outbox GROUP BY status").fetchall()
+    conn.close()
+    return {row['status']: row['n'] for row in rows}
@@ -4,9 +4,11 @@ SMS and Email notifications using Twilio and SendGrid
 """
 
 import os
+import threading
 from twilio.rest import Client
-from sendgrid import SendGridAPIClient
+from twilio.http.http_client import TwilioHttpClient
 from sendgrid.helpers.mail import Mail
+from services import http_client
 
 # Twilio configuration
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
@@ -16,6 +18,22 @@ TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
 # SendGrid configuration
 SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
 FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@safehertravel.com')
+SENDGRID_SEND_URL = 'https://api.sendgrid.com/v3/mail/send'
+
+# One Twilio client for the process, sending over the shared pooled session
+_twilio_client = None
+_twilio_lock = threading.Lock()
+
+def get_twilio_client():
+    """Get the shared Twilio client (created on first use)"""
+    global _twilio_client
+    if _twilio_client is None:
+        with _twilio_lock:
+            if _twilio_client is None:
+                twilio_http = TwilioHttpClient(timeout=http_client.HTTP_TIMEOUT)
+                twilio_http.session = http_client.get_session('api.twilio.com')
+                _twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=twilio_http)
+    return _twilio_client
 
 def send_sms(to_phone, message):
     """
@@ -34,7 +52,7 @@ def send_sms(to_phone, message):
             print(f"[SMS SIMULATION] Message: {message}")
             return True
         
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
         
         message = client.messages.create(
             body=message,
@@ -75,8 +93,15 @@ def send_email(to_email, subject, content):
             html_content=content
         )
         
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
+        # Sent over the shared pooled session rather than a new SendGridAPIClient connection
+        response = http_client.post(
+            SENDGRID_SEND_URL,
+            json=message.get(),
+            headers={'Authorization': f'Bearer {SENDGRID_API_KEY}'}
+        )
+        if response.status_code >= 300:
+            print(f"Email sending failed: {response.status_code} {response.text}")
+            return False
         
         print(f"Email sent successfully: {response.status_code}")
         return True
@@ -155,11 +180,18 @@ def send_sos_alert_email(email, user_name, location):
     return send_email(email, subject, content)
 
 def send_location_share_notification(phone, user_name, share_link):
-    """Send location sharing notification"""
+    """Queue location sharing notification (returns True once queued)"""
+    from services.notification_outbox import enqueue_sms
+    
     message = f"""{user_name} is sharing their live location with you via Safe Her Travel.
 
 Track their location here: {share_link}
 
 This link will remain active for the specified duration."""
     
-    return send_sms(phone, message)
\ No newline at end of file
+    try:
+        enqueue_sms(phone, message, idempotency_key=f"share-link:{share_link}:{phone}")
+        return True
+    except Exception as e:
+        print(f"Location share SMS queueing failed: {e}")
+        return False
\ No newline at end of file
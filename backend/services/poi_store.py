@@ -0,0 +1,233 @@
+"""
+POI Store
+Persistent second cache tier for live POI lookups (Overpass, Mapillary).
+A local SQLite file in WAL mode, so every gunicorn worker on the host can read
+what any other worker fetched, and entries survive deploys and worker recycles.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Default lives in the backend folder, whatever directory the process starts in
+POI_STORE_PATH = os.getenv('POI_STORE_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                          'poi_cache.db'))
+
+# Stale entries older than this are treated as missing instead of served
+POI_STORE_MAX_STALE = int(os.getenv('POI_STORE_MAX_STALE_SECONDS', 7 * 24 * 3600))
+
+# Entries too stale to serve are purged at most this often (from save_tile)
+PURGE_INTERVAL_SECONDS = 3600
+
+_local = threading.local()
+_last_purge = 0.0
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Per-thread connection to the store (sqlite3 connections are not shared across threads)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(POI_STORE_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    _ensure_schema(conn)
+    return conn
+
+
+def _ensure_schema(conn: sqlite3.Connection):
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS poi_tiles (
+                source TEXT NOT NULL,
+                amenity TEXT NOT NULL,
+                tile TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (source, amenity, tile)
+            )
+        """)
+        # Cross-worker single flight: the worker holding a lease fetches the tile,
+        # the others wait for it to land in poi_tiles
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS poi_fetch_leases (
+                source TEXT NOT NULL,
+                amenity TEXT NOT NULL,
+                tile TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (source, amenity, tile)
+            )
+        """)
+        # Failed fetches, so workers waiting on a lease stop polling early
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS poi_fetch_failures (
+                source TEXT NOT NULL,
+                amenity TEXT NOT NULL,
+                tile TEXT NOT NULL,
+                failed_at REAL NOT NULL,
+                PRIMARY KEY (source, amenity, tile)
+            )
+        """)
+        conn.commit()
+        _schema_ready = True
+
+
+def load_tile(source: str, amenity: str, tile: str) -> Optional[Tuple[List[Dict], float]]:
+    """
+    Read a cached tile
+
+    Returns:
+        tuple: (pois, age_seconds), or None if missing or too stale to serve
+    """
+    try:
+        conn = _get_connection()
+        row = conn.execute(
+            "SELECT fetched_at, payload FROM poi_tiles WHERE source = ? AND amenity = ? AND tile = ?",
+            (source, amenity, tile)
+        ).fetchone()
+        if not row:
+            return None
+        age = time.time() - row[0]
+        if age > POI_STORE_MAX_STALE:
+            return None
+        return json.loads(row[1]), age
+    except Exception as e:
+        print(f"[POI STORE] Read failed for {source}/{amenity}/{tile}: {e}")
+        return None
+
+
+def save_tile(source: str, amenity: str, tile: str, pois: List[Dict]):
+    """Write (or replace) a tile with freshly fetched POIs"""
+    global _last_purge
+    try:
+        conn = _get_connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO poi_tiles (source, amenity, tile, fetched_at, payload) VALUES (?, ?, ?, ?, ?)",
+            (source, amenity, tile, now, json.dumps(pois))
+        )
+        conn.commit()
+        if now - _last_purge > PURGE_INTERVAL_SECONDS:
+            _last_purge = now
+            purged = purge_stale()
+            if purged:
+                print(f"[POI STORE] Purged {purged} stale tiles")
+    except Exception as e:
+        print(f"[POI STORE] Write failed for {source}/{amenity}/{tile}: {e}")
+
+
+def _lease_owner() -> str:
+    # Resolved per call: workers forked from a preloading master share import-time state
+    return str(os.getpid())
+
+
+def acquire_leases(source: str, keys: List[Tuple[str, str]], ttl: float) -> List[Tuple[str, str]]:
+    """
+    Try to become the fetching worker for (amenity, tile) keys
+
+    Returns:
+        list: The keys this worker now holds (others are being fetched elsewhere)
+    """
+    owner = _lease_owner()
+    try:
+        conn = _get_connection()
+        now = time.time()
+        with conn:
+            conn.execute("DELETE FROM poi_fetch_leases WHERE expires_at < ?", (now,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO poi_fetch_leases (source, amenity, tile, owner, expires_at) VALUES (?, ?, ?, ?, ?)",
+                [(source, amenity, tile, owner, now + ttl) for amenity, tile in keys]
+            )
+        held = []
+        for amenity, tile in keys:
+            row = conn.execute(
+                "SELECT owner FROM poi_fetch_leases WHERE source = ? AND amenity = ? AND tile = ?",
+                (source, amenity, tile)
+            ).fetchone()
+            if not row or row[0] == owner:
+                held.append((amenity, tile))
+        return held
+    except Exception as e:
+        # Without the store we cannot coordinate, so fetch everything ourselves
+        print(f"[POI STORE] Lease acquisition failed: {e}")
+        return list(keys)
+
+
+def release_leases(source: str, keys: List[Tuple[str, str]]):
+    try:
+        conn = _get_connection()
+        with conn:
+            conn.executemany(
+                "DELETE FROM poi_fetch_leases WHERE source = ? AND amenity = ? AND tile = ? AND owner = ?",
+                [(source, amenity, tile, _lease_owner()) for amenity, tile in keys]
+            )
+    except Exception as e:
+        print(f"[POI STORE] Lease release failed: {e}")
+
+
+def record_failures(source: str, keys: List[Tuple[str, str]]):
+    """Mark (amenity, tile) fetches as failed for workers polling on them"""
+    try:
+        conn = _get_connection()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO poi_fetch_failures (source, amenity, tile, failed_at) VALUES (?, ?, ?, ?)",
+                [(source, amenity, tile, now) for amenity, tile in keys]
+            )
+    except Exception as e:
+        print(f"[POI STORE] Failure marker write failed: {e}")
+
+
+def poll_fetch(source: str, amenity: str, tile: str, since: float) -> Tuple[str, Optional[List[Dict]]]:
+    """
+    Check on a tile another worker holds the lease for
+
+    Args:
+        since: Only tiles fetched and failures recorded after this time count
+
+    Returns:
+        tuple: (state, pois) where state is 'ready' (pois set), 'failed',
+               'abandoned' (no live lease and nothing written) or 'pending'
+    """
+    try:
+        conn = _get_connection()
+        key = (source, amenity, tile)
+        row = conn.execute(
+            "SELECT fetched_at, payload FROM poi_tiles WHERE source = ? AND amenity = ? AND tile = ?", key
+        ).fetchone()
+        if row and row[0] >= since:
+            return 'ready', json.loads(row[1])
+        row = conn.execute(
+            "SELECT failed_at FROM poi_fetch_failures WHERE source = ? AND amenity = ? AND tile = ?", key
+        ).fetchone()
+        if row and row[0] >= since:
+            return 'failed', None
+        row = conn.execute(
+            "SELECT 1 FROM poi_fetch_leases WHERE source = ? AND amenity = ? AND tile = ? AND expires_at >= ?",
+            key + (time.time(),)
+        ).fetchone()
+        return ('pending' if row else 'abandoned'), None
+    except Exception as e:
+        print(f"[POI STORE] Poll failed for {source}/{amenity}/{tile}: {e}")
+        return 'abandoned', None
+
+
+def purge_stale() -> int:
+    """Delete entries too old to be served, returning how many were removed"""
+    conn = _get_connection()
+    cursor = conn.execute("DELETE FROM poi_tiles WHERE fetched_at < ?", (time.time() - POI_STORE_MAX_STALE,))
+    conn.execute("DELETE FROM poi_fetch_failures WHERE failed_at < ?", (time.time() - POI_STORE_MAX_STALE,))
+    conn.commit()
+    return cursor.rowcount
@@ -0,0 +1,214 @@
+"""
+Police Grid Service
+Precomputed nearest-police lookup for Tamil Nadu. An offline job
+(precompute_police_grid.py) stores the k nearest stations for every cell of a
+fine lat/lng grid in a compact file that is memory-mapped at runtime, so the SOS
+path can resolve the nearest station without touching the network or the database.
+
+File layout (little endian):
+    header   struct HEADER_FORMAT
+    stations UTF-8 JSON list of station dicts, padded to 8 bytes
+    indexes  uint16[n_lat, n_lng, k]  station positions, nearest first (NO_STATION if unused)
+    dist_dam uint16[n_lat, n_lng, k]  distance from the cell centre in decametres
+
+Stored distances make lookups exact: a station missing from a cell's list is at
+least the cell's k-th distance from its centre, so when the point's candidates
+beat that bound (less the point's offset from the centre) no other station can
+be closer. Otherwise the lookup falls back to a vectorized scan of all stations.
+"""
+
+import os
+import json
+import math
+import struct
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.location_service import calculate_distance, calculate_distances, nearest_indices
+
+POLICE_GRID_PATH = os.getenv('POLICE_GRID_PATH', 'police_grid.bin')
+
+# Coverage and resolution (~1.1km cells)
+TN_BOUNDS = {'south': 8.0, 'west': 76.2, 'north': 13.6, 'east': 80.4}
+GRID_STEP_DEG = 0.01
+GRID_K = 3
+
+MAGIC = b'PGRD'
+VERSION = 1
+HEADER_FORMAT = '<4sHHdddIII'  # magic, version, k, lat0, lng0, step, n_lat, n_lng, stations_len
+NO_STATION = 0xFFFF
+MAX_DISTANCE_DAM = 0xFFFE
+
+_STATION_FIELDS = ('id', 'name', 'address', 'phone', 'district', 'latitude', 'longitude')
+
+_grid = None
+_grid_lock = threading.Lock()
+
+
+class PoliceGrid:
+    """Read-only view over a memory-mapped grid file."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            header = f.read(struct.calcsize(HEADER_FORMAT))
+            magic, version, k, lat0, lng0, step, n_lat, n_lng, stations_len = struct.unpack(HEADER_FORMAT, header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Unsupported police grid file {path}")
+            self.stations = json.loads(f.read(stations_len).decode('utf-8'))
+
+        self.k, self.lat0, self.lng0, self.step = k, lat0, lng0, step
+        self.n_lat, self.n_lng = n_lat, n_lng
+
+        offset = _aligned(len(header) + stations_len)
+        shape = (n_lat, n_lng, k)
+        self.indexes = np.memmap(path, dtype='<u2', mode='r', offset=offset, shape=shape)
+        self.dist_dam = np.memmap(path, dtype='<u2', mode='r', offset=offset + self.indexes.nbytes, shape=shape)
+        self._lats = np.array([s['latitude'] for s in self.stations], dtype=np.float64)
+        self._lngs = np.array([s['longitude'] for s in self.stations], dtype=np.float64)
+
+    def cell(self, lat: float, lng: float) -> Optional[tuple]:
+        i = math.floor((lat - self.lat0) / self.step)
+        j = math.floor((lng - self.lng0) / self.step)
+        if 0 <= i < self.n_lat and 0 <= j < self.n_lng:
+            return i, j
+        return None
+
+    def _cell_centre(self, cell: tuple) -> tuple:
+        return self.lat0 + (cell[0] + 0.5) * self.step, self.lng0 + (cell[1] + 0.5) * self.step
+
+    def nearest(self, lat: float, lng: float, k: int = 1) -> List[Dict]:
+        """Nearest stations to a point, with exact distances from the point itself"""
+        cell = self.cell(lat, lng)
+        if cell is None:
+            return []
+        k = min(k, len(self.stations))
+        positions = np.array([pos for pos in self.indexes[cell] if pos != NO_STATION], dtype=np.intp)
+        distances = calculate_distances(lat, lng, self._lats[positions], self._lngs[positions])
+        order = np.argsort(distances, kind='stable')
+        positions, distances = positions[order], distances[order]
+
+        if len(positions) < len(self.stations):
+            # Unlisted stations are no closer to the point than this (rounding of dist_dam included)
+            bound = (self.dist_dam[cell][-1] / 100 - 0.005) - calculate_distance(lat, lng, *self._cell_centre(cell))
+            if k > len(positions) or distances[k - 1] > bound:
+                distances = calculate_distances(lat, lng, self._lats, self._lngs)
+                positions = nearest_indices(distances, k)
+                distances = distances[positions]
+
+        results = []
+        for pos, distance in zip(positions[:k], distances[:k]):
+            result = dict(self.stations[pos])
+            result['distance_km'] = round(float(distance), 2)
+            results.append(result)
+        return results
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def build_police_grid(stations: List[Dict], path: str = POLICE_GRID_PATH,
+                      bounds: Dict = TN_BOUNDS, step: float = GRID_STEP_DEG, k: int = GRID_K) -> Dict:
+    """
+    Compute the k nearest stations for every grid cell and write the grid file
+
+    Args:
+        stations: Station rows with at least latitude/longitude
+        path: Output file (written atomically)
+        bounds: Area to cover (south/west/north/east)
+        step: Cell size in degrees
+        k: Stations stored per cell
+
+    Returns:
+        dict: Summary (cells, stations, file size, nearest-distance percentiles)
+    """
+    if len(stations) >= NO_STATION:
+        raise ValueError("Too many stations for a uint16 index")
+    stations = [{field: s.get(field) for field in _STATION_FIELDS} for s in stations]
+    k = min(k, len(stations))
+
+    n_lat = int(round((bounds['north'] - bounds['south']) / step))
+    n_lng = int(round((bounds['east'] - bounds['west']) / step))
+    centre_lats = bounds['south'] + (np.arange(n_lat) + 0.5) * step
+    centre_lngs = bounds['west'] + (np.arange(n_lng) + 0.5) * step
+    grid_lats, grid_lngs = np.meshgrid(centre_lats, centre_lngs, indexing='ij')
+    grid_lats, grid_lngs = grid_lats.ravel(), grid_lngs.ravel()
+
+    # Running top-k over stations, one vectorized pass per station
+    best_dist = np.full((grid_lats.size, k), np.inf)
+    best_idx = np.full((grid_lats.size, k), NO_STATION, dtype=np.int64)
+    for pos, station in enumerate(stations):
+        dist = calculate_distances(station['latitude'], station['longitude'], grid_lats, grid_lngs)
+        closer = dist < best_dist[:, -1]
+        if not closer.any():
+            continue
+        merged_dist = np.concatenate([best_dist[closer], dist[closer, None]], axis=1)
+        merged_idx = np.concatenate([best_idx[closer], np.full((int(closer.sum()), 1), pos)], axis=1)
+        order = np.argsort(merged_dist, axis=1)[:, :k]
+        best_dist[closer] = np.take_along_axis(merged_dist, order, axis=1)
+        best_idx[closer] = np.take_along_axis(merged_idx, order, axis=1)
+
+    indexes = best_idx.astype('<u2').reshape(n_lat, n_lng, k)
+    dist_dam = np.minimum(np.rint(best_dist * 100), MAX_DISTANCE_DAM).astype('<u2').reshape(n_lat, n_lng, k)
+
+    stations_blob = json.dumps(stations, separators=(',', ':')).encode('utf-8')
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, k, bounds['south'], bounds['west'], step,
+                         n_lat, n_lng, len(stations_blob))
+    padding = b'\0' * (_aligned(len(header) + len(stations_blob)) - len(header) - len(stations_blob))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(stations_blob)
+        f.write(padding)
+        f.write(indexes.tobytes())
+        f.write(dist_dam.tobytes())
+    os.replace(tmp_path, path)
+
+    nearest_km = best_dist[:, 0] if k else np.empty(0)
+    return {
+        'cells': n_lat * n_lng,
+        'stations': len(stations),
+        'k': k,
+        'bytes': os.path.getsize(path),
+        'nearest_km_p50': float(np.percentile(nearest_km, 50)) if nearest_km.size else None,
+        'nearest_km_max': float(nearest_km.max()) if nearest_km.size else None,
+    }
+
+
+def get_police_grid() -> Optional[PoliceGrid]:
+    """Get the mapped grid, loading it on first use (None if the file has not been built)"""
+    global _grid
+    if _grid is not None:
+        return _grid
+    with _grid_lock:
+        if _grid is None and os.path.exists(POLICE_GRID_PATH):
+            try:
+                _grid = PoliceGrid(POLICE_GRID_PATH)
+                print(f"[POLICE GRID] Loaded {_grid.n_lat}x{_grid.n_lng} grid with {len(_grid.stations)} stations")
+            except Exception as e:
+                print(f"[POLICE GRID] Failed to load {POLICE_GRID_PATH}: {e}")
+        return _grid
+
+
+def reload_police_grid():
+    """Drop the mapped grid so the next lookup picks up a rebuilt file"""
+    global _grid
+    with _grid_lock:
+        _grid = None
+
+
+def find_nearest_police(lat: float, lng: float, k: int = 1) -> List[Dict]:
+    """
+    Nearest police stations from the precomputed grid
+
+    Returns:
+        list: Station dicts with distance_km, or [] if the grid is missing or
+              the point is outside its coverage
+    """
+    grid = get_police_grid()
+    if grid is None:
+        return []
+    return grid.nearest(lat, lng, k)
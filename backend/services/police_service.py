@@ -3,9 +3,50 @@ Police Service
 Handle police station alerts and emergency dispatch
 """
 
-from database.db import get_db_connection
 from services.mapillary_service import search_pois_overpass
-from services.location_service import get_nearest_locations, estimate_travel_time
+from services.location_service import estimate_travel_time
+from services.spatial_index import find_nearest, find_by_district
+from services.police_grid import find_nearest_police
+
+def _station_response(nearest):
+    """Shape a station with distance_km into the dispatch response (with ETA)"""
+    # Base dispatch time (min 2 mins) + travel time
+    travel_mins = estimate_travel_time(nearest['distance_km'], mode='driving')
+    dispatch_time = 2
+    total_eta = travel_mins + dispatch_time
+    
+    # Ensure a realistic minimum for "help arrived in X min"
+    total_eta = max(total_eta, 3) 
+    
+    return {
+        'name': nearest['name'],
+        'address': nearest.get('address') or 'Location broadcast to nearest unit',
+        'phone': nearest.get('phone') or '100',
+        'distance_km': nearest['distance_km'],
+        'eta_minutes': total_eta,
+        'source': nearest.get('source', 'Emergency Services')
+    }
+
+def nearest_police_precomputed(location):
+    """
+    Nearest police station from the precomputed grid (no network or database access)
+    
+    Args:
+        location: Dict with 'lat' and 'lng'
+    
+    Returns:
+        dict: Station info with ETA, or None if the grid is unavailable for this point
+    """
+    try:
+        stations = find_nearest_police(location['lat'], location['lng'], k=1)
+        if not stations:
+            return None
+        nearest = stations[0]
+        nearest['source'] = 'Precomputed Grid'
+        return _station_response(nearest)
+    except Exception as e:
+        print(f"Error reading police grid: {e}")
+        return None
 
 def alert_nearest_police(location):
     """
@@ -30,43 +71,24 @@ def alert_nearest_police(location):
             nearest = stations[0]
             nearest['source'] = 'OpenStreetMap'
         else:
-            # 2. Fallback to local database if OSM fails or is empty
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM police_stations")
-            all_stations = cursor.fetchall()
-            conn.close()
+            # 2. Fallback to the precomputed grid if OSM fails or is empty
+            precomputed = nearest_police_precomputed(location)
+            if precomputed:
+                return precomputed
             
-            if all_stations:
-                stations_list = [dict(station) for station in all_stations]
-                nearest_list = get_nearest_locations(lat, lng, stations_list, limit=1)
-                if nearest_list:
-                    nearest = nearest_list[0]
-                    # Map 'latitude'/'longitude' to 'lat'/'lng' for consistency
-                    nearest['lat'] = nearest['latitude']
-                    nearest['lng'] = nearest['longitude']
-                    nearest['source'] = 'Local Database'
+            # 3. Fallback to local database (spatial index)
+            nearest_list = find_nearest('police_stations', lat, lng, k=1)
+            if nearest_list:
+                nearest = nearest_list[0]
+                # Map 'latitude'/'longitude' to 'lat'/'lng' for consistency
+                nearest['lat'] = nearest['latitude']
+                nearest['lng'] = nearest['longitude']
+                nearest['source'] = 'Local Database'
 
         if nearest:
-            # Calculate more professional ETA
-            # Base dispatch time (min 2 mins) + travel time
-            travel_mins = estimate_travel_time(nearest['distance_km'], mode='driving')
-            dispatch_time = 2
-            total_eta = travel_mins + dispatch_time
-            
-            # Ensure a realistic minimum for "help arrived in X min"
-            total_eta = max(total_eta, 3) 
-            
-            return {
-                'name': nearest['name'],
-                'address': nearest.get('address', 'Location broadcast to nearest unit'),
-                'phone': nearest.get('phone', '100'),
-                'distance_km': nearest['distance_km'],
-                'eta_minutes': total_eta,
-                'source': nearest.get('source', 'Emergency Services')
-            }
+            return _station_response(nearest)
         
-        # 3. Final fallback
+        # 4. Final fallback
         return {
             'name': 'Emergency Dispatch Control',
             'phone': '112',
@@ -87,17 +109,7 @@ def alert_nearest_police(location):
 def get_police_station_by_district(district):
     """Get police stations in a specific district"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM police_stations
-            WHERE district = ?
-        """, (district,))
-        
-        stations = cursor.fetchall()
-        conn.close()
-        
-        return [dict(station) for station in stations]
+        return find_by_district('police_stations', district)
         
     except Exception as e:
         print(f"Error fetching police stations: {e}")
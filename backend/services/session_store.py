@@ -0,0 +1,243 @@
+"""
+Session Store
+Shared key/value store for short-lived session state (active SOS alerts, live
+location shares) so every gunicorn worker sees the same sessions.
+
+Backends (selected with SESSION_STORE):
+    sqlite  Local SQLite file in WAL mode, shared by all workers on one host (default);
+            SESSION_STORE_PATH, or sessions.db next to the main database file
+    redis   Any Redis-protocol server at REDIS_URL, shared across hosts
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+SESSION_STORE = os.getenv('SESSION_STORE', 'sqlite').lower()
+SESSION_STORE_PATH = os.getenv('SESSION_STORE_PATH')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_TIMEOUT = float(os.getenv('REDIS_TIMEOUT', 2))
+
+# Expired rows are purged at most this often (reads already ignore them)
+PURGE_INTERVAL_SECONDS = 60
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _default_sqlite_path() -> str:
+    """sessions.db in the main database's directory, whatever the working directory"""
+    from database import db
+    return os.path.join(os.path.dirname(os.path.abspath(db.DATABASE_PATH)), 'sessions.db')
+
+
+class SQLiteSessionStore:
+    """Sessions as JSON rows keyed by (namespace, key) with an absolute expiry."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or SESSION_STORE_PATH or _default_sqlite_path()
+        self._local = threading.local()
+        self._last_purge = 0.0
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT value FROM sessions WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Dict, ttl: float):
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), now + ttl)
+        )
+        if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def update(self, namespace: str, key: str, fn: Callable[[Dict], Any]) -> Optional[Dict]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM sessions WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            value = json.loads(row[0])
+            fn(value)
+            conn.execute(
+                "UPDATE sessions SET value = ? WHERE namespace = ? AND key = ?",
+                (json.dumps(value), namespace, key)
+            )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, namespace: str, key: str):
+        self._connection().execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (namespace, key))
+
+
+class RedisError(Exception):
+    """Error reply from the Redis server."""
+
+
+class _RespConnection:
+    """Minimal RESP2 client connection (one per thread)."""
+
+    def __init__(self, host: str, port: int, password: Optional[str], db: int):
+        self.sock = socket.create_connection((host, port), timeout=REDIS_TIMEOUT)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    def execute(self, *args) -> Any:
+        parts = [f'*{len(args)}\r\n'.encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        self.sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisSessionStore:
+    """Sessions as JSON strings under '<namespace>:<key>' with native key expiry."""
+
+    # Optimistic update attempts before giving up on a hot key
+    MAX_UPDATE_RETRIES = 20
+
+    def __init__(self, url: str = REDIS_URL):
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip('/') or 0)
+        self._local = threading.local()
+
+    def _execute(self, *args) -> Any:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = _RespConnection(self.host, self.port, self.password, self.db)
+            self._local.conn = conn
+        try:
+            return conn.execute(*args)
+        except (OSError, ConnectionError):
+            # Drop the broken connection so the next call reconnects
+            conn.close()
+            self._local.conn = None
+            raise
+
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        data = self._execute('GET', f'{namespace}:{key}')
+        return json.loads(data) if data is not None else None
+
+    def set(self, namespace: str, key: str, value: Dict, ttl: float):
+        self._execute('SET', f'{namespace}:{key}', json.dumps(value), 'PX', int(ttl * 1000))
+
+    def update(self, namespace: str, key: str, fn: Callable[[Dict], Any]) -> Optional[Dict]:
+        name = f'{namespace}:{key}'
+        for attempt in range(self.MAX_UPDATE_RETRIES):
+            if attempt:
+                # Another writer won the race; back off briefly before re-reading
+                time.sleep(random.uniform(0, 0.002 * attempt))
+            self._execute('WATCH', name)
+            data = self._execute('GET', name)
+            ttl_ms = self._execute('PTTL', name)
+            if data is None or ttl_ms <= 0:
+                self._execute('UNWATCH')
+                return None
+            value = json.loads(data)
+            try:
+                fn(value)
+            except Exception:
+                self._execute('UNWATCH')
+                raise
+            self._execute('MULTI')
+            self._execute('SET', name, json.dumps(value), 'PX', ttl_ms)
+            if self._execute('EXEC') is not None:
+                return value
+        raise RedisError(f"Too much contention updating {name}")
+
+    def delete(self, namespace: str, key: str):
+        self._execute('DEL', f'{namespace}:{key}')
+
+
+def get_session_store():
+    """Get the process-wide session store for the configured backend"""
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            if SESSION_STORE == 'redis':
+                _store = RedisSessionStore(REDIS_URL)
+            elif SESSION_STORE == 'sqlite':
+                _store = SQLiteSessionStore()
+            else:
+                raise ValueError(f"Unknown SESSION_STORE '{SESSION_STORE}'")
+            print(f"[SESSION STORE] Using {SESSION_STORE} backend")
+        return _store
@@ -0,0 +1,107 @@
+"""
+Single Flight
+Coalesces concurrent identical upstream lookups: the first caller for a key does
+the work, everyone else arriving while it is in flight waits and shares the result.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Every group registers itself here so its counters can be scraped via /api/metrics
+_registry: Dict[str, 'SingleFlight'] = {}
+
+
+class _Call:
+    """One in-flight lookup that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        if not self.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for in-flight lookup")
+        if self.error:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """
+    Group of keyed in-flight calls within one process. Callers can layer a
+    cross-process mechanism on top for the keys they lead (see mapillary_service).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+        # Keys a leader got from another worker instead of fetching (cross-process extensions)
+        self.remote_coalesced = 0
+
+        _registry[name] = self
+
+    def claim(self, key) -> Tuple[bool, _Call]:
+        """
+        Join or start the call for a key
+
+        Returns:
+            tuple: (is_leader, call). The leader must finish the call with complete().
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call:
+                self.coalesced += 1
+                return False, call
+            call = _Call()
+            self._calls[key] = call
+            self.leaders += 1
+            return True, call
+
+    def complete(self, key, value=None, error: Optional[BaseException] = None):
+        """Publish the leader's result and release every waiting follower"""
+        with self._lock:
+            call = self._calls.pop(key, None)
+            if error is not None:
+                self.errors += 1
+        if call:
+            call.value = value
+            call.error = error
+            call.done.set()
+
+    def record_remote(self):
+        """Count a key a leader got from another worker instead of fetching"""
+        with self._lock:
+            self.remote_coalesced += 1
+
+    def do(self, key, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run fn() once for all concurrent callers with the same key"""
+        is_leader, call = self.claim(key)
+        if not is_leader:
+            return call.wait(timeout)
+        try:
+            value = fn()
+        except BaseException as e:
+            self.complete(key, error=e)
+            raise
+        self.complete(key, value)
+        return value
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'remote_coalesced': self.remote_coalesced,
+            'errors': self.errors,
+        }
+
+
+def get_single_flight_stats() -> Dict:
+    """Counters for every registered group, keyed by group name"""
+    return {name: group.stats() for name, group in _registry.items()}
@@ -0,0 +1,220 @@
+"""
+Spatial Index Service
+In-memory grid index over the reference tables (police stations, hospitals, safe zones)
+so radius and nearest-neighbour lookups only touch rows near the query point.
+"""
+
+import os
+import math
+import time
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from database.db import get_db_connection
+from services.location_service import calculate_distances, nearest_indices, get_location_bounds
+
+# Grid cell size in degrees (~11km at Tamil Nadu latitudes)
+CELL_SIZE_DEG = 0.1
+
+# Rebuild interval so rows loaded by setup_database.py are picked up without a restart
+INDEX_REFRESH_SECONDS = int(os.getenv('SPATIAL_INDEX_REFRESH_SECONDS', 600))
+
+# Only these tables may be indexed (table names are interpolated into SQL)
+INDEXED_TABLES = ('police_stations', 'hospitals', 'safe_zones')
+
+# km per degree, used to bound the distance of unvisited grid rings
+_KM_PER_DEG_LAT = 110.574
+_KM_PER_DEG_LON = 111.320
+
+_indexes: Dict = {}
+_index_lock = threading.Lock()
+
+
+class GridIndex:
+    """Uniform lat/lng grid bucketing rows of one reference table."""
+
+    def __init__(self, rows: List[Dict], cell_size: float = CELL_SIZE_DEG):
+        self.cell_size = cell_size
+        self.cells: Dict = {}
+        self.by_district: Dict = {}
+        self.size = len(rows)
+        self.built_at = time.time()
+        self._min_cell = None
+        self._max_cell = None
+
+        # Rows are stored grouped by cell so each cell is a contiguous slice
+        self.rows = sorted(rows, key=lambda r: self._cell(r['latitude'], r['longitude']))
+        self.lats = np.array([r['latitude'] for r in self.rows], dtype=np.float64)
+        self.lngs = np.array([r['longitude'] for r in self.rows], dtype=np.float64)
+
+        for pos, row in enumerate(self.rows):
+            cell = self._cell(row['latitude'], row['longitude'])
+            start, _ = self.cells.get(cell, (pos, pos))
+            self.cells[cell] = (start, pos + 1)
+            district = row.get('district')
+            if district:
+                self.by_district.setdefault(district, []).append(row)
+
+        if self.cells:
+            self._min_cell = (min(c[0] for c in self.cells), min(c[1] for c in self.cells))
+            self._max_cell = (max(c[0] for c in self.cells), max(c[1] for c in self.cells))
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+    def _positions(self, cells) -> np.ndarray:
+        slices = [np.arange(*self.cells[c]) for c in cells if c in self.cells]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(slices)
+
+    def within_radius(self, lat: float, lng: float, radius_km: float) -> List[tuple]:
+        """
+        Find rows within radius_km of a point
+
+        Returns:
+            list: (distance_km, row) tuples sorted by distance
+        """
+        bounds = get_location_bounds(lat, lng, radius_km)
+        min_i, min_j = self._cell(bounds['min_lat'], bounds['min_lon'])
+        max_i, max_j = self._cell(bounds['max_lat'], bounds['max_lon'])
+
+        positions = self._positions(
+            (i, j) for i in range(min_i, max_i + 1) for j in range(min_j, max_j + 1)
+        )
+        distances = calculate_distances(lat, lng, self.lats[positions], self.lngs[positions])
+        inside = np.flatnonzero(distances <= radius_km)
+        order = inside[np.argsort(distances[inside], kind='stable')]
+        return [(float(distances[o]), self.rows[positions[o]]) for o in order]
+
+    def nearest(self, lat: float, lng: float, k: int = 1,
+                max_radius_km: Optional[float] = None) -> List[tuple]:
+        """
+        Find the k nearest rows by searching outward ring by ring
+
+        Returns:
+            list: Up to k (distance_km, row) tuples sorted by distance
+        """
+        if not self.size or k <= 0:
+            return []
+
+        ci, cj = self._cell(lat, lng)
+        max_ring = max(
+            abs(ci - self._min_cell[0]), abs(ci - self._max_cell[0]),
+            abs(cj - self._min_cell[1]), abs(cj - self._max_cell[1])
+        )
+
+        positions = np.empty(0, dtype=np.intp)
+        distances = np.empty(0, dtype=np.float64)
+        for ring in range(max_ring + 1):
+            # Only the perimeter of the ring is new
+            ring_cells = [
+                (i, j)
+                for i in range(ci - ring, ci + ring + 1)
+                for j in range(cj - ring, cj + ring + 1)
+                if not ring or abs(i - ci) == ring or abs(j - cj) == ring
+            ]
+            ring_positions = self._positions(ring_cells)
+            if len(ring_positions):
+                positions = np.concatenate([positions, ring_positions])
+                distances = np.concatenate([distances, calculate_distances(
+                    lat, lng, self.lats[ring_positions], self.lngs[ring_positions]
+                )])
+
+            # Anything in an unvisited ring is at least this far away (narrower axis wins)
+            widest_lat = min(abs(lat) + (ring + 1) * self.cell_size, 89.0)
+            reach_km = ring * self.cell_size * min(_KM_PER_DEG_LAT, _KM_PER_DEG_LON * math.cos(math.radians(widest_lat)))
+            if max_radius_km is not None and reach_km >= max_radius_km:
+                break
+            if len(distances) >= k and np.partition(distances, k - 1)[k - 1] <= reach_km:
+                break
+
+        selected = nearest_indices(distances, k)
+        if max_radius_km is not None:
+            selected = selected[distances[selected] <= max_radius_km]
+        return [(float(distances[s]), self.rows[positions[s]]) for s in selected]
+
+
+def _load_rows(table: str) -> List[Dict]:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM {table}")
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def get_spatial_index(table: str) -> GridIndex:
+    """Get the grid index for a reference table, building or refreshing it if stale"""
+    if table not in INDEXED_TABLES:
+        raise ValueError(f"Table '{table}' is not spatially indexed")
+
+    index = _indexes.get(table)
+    if index and time.time() - index.built_at < INDEX_REFRESH_SECONDS:
+        return index
+
+    with _index_lock:
+        index = _indexes.get(table)
+        if index and time.time() - index.built_at < INDEX_REFRESH_SECONDS:
+            return index
+        index = GridIndex(_load_rows(table))
+        _indexes[table] = index
+        print(f"[SPATIAL INDEX] Built {table} index: {index.size} rows in {len(index.cells)} cells")
+        return index
+
+
+def invalidate_spatial_index(table: Optional[str] = None):
+    """Drop cached indexes so the next query rebuilds from the database"""
+    with _index_lock:
+        if table:
+            _indexes.pop(table, None)
+        else:
+            _indexes.clear()
+
+
+def _with_distance(dist: float, row: Dict) -> Dict:
+    result = dict(row)
+    result['distance_km'] = round(dist, 2)
+    return result
+
+
+def find_within_radius(table: str, lat: float, lng: float, radius_km: float) -> List[Dict]:
+    """
+    Get reference rows within a radius, nearest first
+
+    Args:
+        table: One of INDEXED_TABLES
+        lat, lng: Query point
+        radius_km: Radius in kilometers
+
+    Returns:
+        list: Row dicts with 'distance_km' added
+    """
+    index = get_spatial_index(table)
+    return [_with_distance(dist, row) for dist, row in index.within_radius(lat, lng, radius_km)]
+
+
+def find_nearest(table: str, lat: float, lng: float, k: int = 1,
+                 max_radius_km: Optional[float] = None) -> List[Dict]:
+    """
+    Get the k nearest reference rows
+
+    Args:
+        table: One of INDEXED_TABLES
+        lat, lng: Query point
+        k: Number of rows to return
+        max_radius_km: Optional search cut-off
+
+    Returns:
+        list: Row dicts with 'distance_km' added, nearest first
+    """
+    index = get_spatial_index(table)
+    return [_with_distance(dist, row) for dist, row in index.nearest(lat, lng, k, max_radius_km)]
+
+
+def find_by_district(table: str, district: str) -> List[Dict]:
+    """Get reference rows for a district from the index"""
+    index = get_spatial_index(table)
+    return [dict(row) for row in index.by_district.get(district, ())]
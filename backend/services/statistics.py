@@ -0,0 +1,61 @@
+"""
+Platform Statistics
+Dashboard counts served from the trigger-maintained table_counters (see
+database.migrations), cached in memory for STATISTICS_CACHE_SECONDS. Each
+refresh reads a handful of rows whatever the size of the counted tables.
+"""
+
+import os
+from typing import Dict
+
+from database.db import get_db_connection
+from database.migrations import ensure_schema
+from services.ttl_cache import TTLCache
+
+STATISTICS_CACHE_SECONDS = float(os.getenv('STATISTICS_CACHE_SECONDS', 5))
+
+_counters = TTLCache('statistics', max_entries=1, default_ttl=STATISTICS_CACHE_SECONDS)
+
+
+def get_counters() -> Dict[str, int]:
+    """
+    Current row counts
+
+    Returns:
+        dict: Counter name -> value (users, sos_alerts, sos_alerts_resolved,
+              police_stations, hospitals, safe_zones)
+    """
+    found, counters = _counters.get('all')
+    if found:
+        return counters
+
+    ensure_schema()
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT name, value FROM table_counters").fetchall()
+    finally:
+        conn.close()
+
+    counters = {row['name']: row['value'] for row in rows}
+    _counters.set('all', counters)
+    return counters
+
+
+def get_platform_statistics() -> Dict:
+    """Statistics payload for /api/statistics"""
+    counters = get_counters()
+    total_sos = counters.get('sos_alerts', 0)
+    resolved_sos = counters.get('sos_alerts_resolved', 0)
+    return {
+        'users': counters.get('users', 0),
+        'sos_alerts': {
+            'total': total_sos,
+            'resolved': resolved_sos,
+            'active': total_sos - resolved_sos
+        },
+        'emergency_resources': {
+            'police_stations': counters.get('police_stations', 0),
+            'hospitals': counters.get('hospitals', 0),
+            'safe_zones': counters.get('safe_zones', 0)
+        }
+    }
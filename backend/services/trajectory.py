@@ -0,0 +1,110 @@
+"""
+Trajectory Service
+Downsampling of location tracks: Douglas-Peucker simplification under a
+distance tolerance, time bucketing and a hard point budget.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.location_service import EARTH_RADIUS_KM
+
+EARTH_RADIUS_M = EARTH_RADIUS_KM * 1000
+
+
+def to_epoch(value) -> float:
+    """Epoch seconds from a stored created_at (datetime or sqlite text)"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+def douglas_peucker(lats, lngs, tolerance_m: float) -> np.ndarray:
+    """
+    Indices of the points kept by Douglas-Peucker simplification
+
+    Distances are measured to the segment (not the infinite line) on a local
+    equirectangular projection, which is accurate to well under a metre at
+    trajectory scales.
+
+    Args:
+        lats, lngs: Coordinates in track order
+        tolerance_m: Maximum deviation of a dropped point from the simplified track
+
+    Returns:
+        numpy.ndarray: Sorted indices, always including the first and last point
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    n = len(lats)
+    if n < 3:
+        return np.arange(n)
+
+    origin_lat = math.radians(float(lats.mean()))
+    x = np.radians(lngs) * math.cos(origin_lat) * EARTH_RADIUS_M
+    y = np.radians(lats) * EARTH_RADIUS_M
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0:
+            distances = np.hypot(px, py)
+        else:
+            t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0)
+            distances = np.hypot(px - t * dx, py - t * dy)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance_m:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def time_buckets(timestamps, bucket_seconds: float) -> np.ndarray:
+    """Indices of the first point in each time bucket, plus the last point"""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if len(timestamps) == 0:
+        return np.arange(0)
+    _, first = np.unique(np.floor(timestamps / bucket_seconds), return_index=True)
+    return np.union1d(first, [len(timestamps) - 1])
+
+
+def simplify_track(rows: List[Dict], tolerance_m: Optional[float] = None,
+                   bucket_seconds: Optional[float] = None, max_points: Optional[int] = None) -> List[Dict]:
+    """
+    Downsample a track
+
+    Args:
+        rows: Fixes in time order with latitude, longitude and created_at
+        tolerance_m: Douglas-Peucker tolerance in metres
+        bucket_seconds: Keep at most one fix per bucket
+        max_points: Final budget; evenly thins whatever is left, keeping the endpoints
+                    (a budget of 1 keeps only the latest fix)
+
+    Returns:
+        list: The kept rows, in time order
+    """
+    indices = np.arange(len(rows))
+    if bucket_seconds:
+        indices = indices[time_buckets([to_epoch(rows[i]['created_at']) for i in indices], bucket_seconds)]
+    if tolerance_m:
+        kept = douglas_peucker([rows[i]['latitude'] for i in indices],
+                               [rows[i]['longitude'] for i in indices], tolerance_m)
+        indices = indices[kept]
+    if max_points and len(indices) > max_points:
+        if max_points == 1:
+            indices = indices[-1:]
+        else:
+            indices = indices[np.unique(np.linspace(0, len(indices) - 1, max_points).round().astype(int))]
+    return [rows[i] for i in indices]
@@ -0,0 +1,134 @@
+"""
+TTL Cache
+Bounded, thread-safe LRU cache with per-key TTLs, negative caching and hit/miss counters
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Every cache registers itself here so its counters can be scraped via /api/metrics
+_registry: Dict[str, 'TTLCache'] = {}
+
+# Expired entries are swept from a cache at most this often (on writes), so they do not
+# hold memory until LRU eviction reaches them
+PURGE_INTERVAL_SECONDS = 60
+
+
+class TTLCache:
+    """
+    LRU cache where every entry expires after a TTL.
+
+    Negative entries (upstream failures, empty results) are stored with their own
+    short TTL so repeated misses do not hammer the upstream service.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, default_ttl: float = 300,
+                 negative_ttl: float = 30, ttl_for: Optional[Callable[[Any], float]] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.ttl_for = ttl_for
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = time.time()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        _registry[name] = self
+
+    def get(self, key) -> Tuple[bool, Any]:
+        """
+        Look up a key
+
+        Returns:
+            tuple: (found, value). Negative entries are found with their stored value.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, value, negative = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            if negative:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full"""
+        if ttl is None:
+            ttl = self.ttl_for(key) if self.ttl_for else self.default_ttl
+        self._store(key, value, ttl, negative=False)
+
+    def set_negative(self, key, value=None, ttl: Optional[float] = None):
+        """Briefly remember a failed or empty lookup"""
+        self._store(key, value, self.negative_ttl if ttl is None else ttl, negative=True)
+
+    def _store(self, key, value, ttl: float, negative: bool):
+        now = time.time()
+        if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            self.purge_expired()
+        with self._lock:
+            self._entries[key] = (now + ttl, value, negative)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry, returning how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+            for k in expired:
+                del self._entries[k]
+            self.expirations += len(expired)
+            return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def get_cache_stats() -> Dict:
+    """Counters for every registered cache, keyed by cache name"""
+    return {name: cache.stats() for name, cache in _registry.items()}
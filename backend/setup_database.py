@@ -6,152 +6,18 @@ Creates tables and seeds with real Tamil Nadu data
 import sqlite3
 import os
 
+from database.migrations import run_migrations
+
 DATABASE_PATH = 'safeher_travel.db'
 
 def create_tables():
-    """Create all required database tables"""
+    """Create all required database tables (versioned schema, see database.migrations)"""
     conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
     
     print("📋 Creating database tables...")
+    version = run_migrations(conn)
     
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Emergency contacts
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS emergency_contacts (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            relationship TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # SOS alerts
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sos_alerts (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            status TEXT DEFAULT 'active',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            resolved_at TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Location history
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS location_history (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            accuracy REAL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Chat messages
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS chat_messages (
-            id TEXT PRIMARY KEY,
-            conversation_id TEXT NOT NULL,
-            user_id TEXT NOT NULL,
-            message TEXT NOT NULL,
-            sender TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Police stations
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS police_stations (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            address TEXT,
-            city TEXT,
-            district TEXT,
-            state TEXT DEFAULT 'Tamil Nadu',
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            phone TEXT,
-            station_type TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Hospitals
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS hospitals (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            address TEXT,
-            city TEXT,
-            district TEXT,
-            state TEXT DEFAULT 'Tamil Nadu',
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            phone TEXT,
-            emergency_phone TEXT,
-            hospital_type TEXT,
-            is_24x7 INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Safe zones
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS safe_zones (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            address TEXT,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            is_24x7 INTEGER DEFAULT 0,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Accommodations
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS accommodations (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            address TEXT,
-            city TEXT,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            phone TEXT,
-            rating REAL,
-            safety_rating REAL,
-            safety_verified INTEGER DEFAULT 0,
-            price_range TEXT,
-            amenities TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    conn.commit()
-    print("✅ Database tables created successfully")
+    print(f"✅ Database tables created successfully (schema version {version})")
     return conn
 
 def seed_tamil_nadu_data(conn):
@@ -82,16 +82,14 @@ class _DashboardPageState extends State<DashboardPage> with SingleTickerProvider
 
   Future<void> _updateNearbyResources(Position pos) async {
     try {
-      final results = await Future.wait([
-        _api.getNearbyPolice(pos.latitude, pos.longitude),
-        _api.getNearbyHospitals(pos.latitude, pos.longitude),
-      ]);
+      final result = await _api.getNearbyResources(pos.latitude, pos.longitude);
+      final counts = result['counts'] ?? {};
 
       if (mounted) {
         setState(() {
           _currentPos = pos;
-          _nearbyPolice = results[0]['count'] ?? 0;
-          _nearbyHospitals = results[1]['count'] ?? 0;
+          _nearbyPolice = counts['police'] ?? 0;
+          _nearbyHospitals = counts['hospital'] ?? 0;
           _isLoading = false;
         });
       }
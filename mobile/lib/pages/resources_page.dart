@@ -30,16 +30,13 @@ class _ResourcesPageState extends State<ResourcesPage> with TickerProviderStateM
     try {
       Position pos = await Geolocator.getCurrentPosition();
       
-      // Load both in parallel - radius is already increased to 10k in api_service
-      final results = await Future.wait([
-        _api.getNearbyPolice(pos.latitude, pos.longitude),
-        _api.getNearbyHospitals(pos.latitude, pos.longitude),
-      ]);
+      // Both categories in one request - radius is already increased to 10k in api_service
+      final result = await _api.getNearbyResources(pos.latitude, pos.longitude);
 
       if (mounted) {
         setState(() {
-          _police = results[0]['resources'] ?? [];
-          _hospitals = results[1]['resources'] ?? [];
+          _police = result['stations'] ?? [];
+          _hospitals = result['hospitals'] ?? [];
           _isLoading = false;
         });
       }
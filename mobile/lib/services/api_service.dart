@@ -132,6 +132,19 @@ class ApiService {
 
   // ─── Resources ─────────────────────────────────────────────────────────────
 
+  // Police stations and hospitals in one request (one upstream lookup for both)
+  Future<Map<String, dynamic>> getNearbyResources(double lat, double lng,
+      {int radius = 10000}) async {
+    try {
+      final response = await http.get(
+        Uri.parse('$baseUrl/resources/nearby?lat=$lat&lng=$lng&radius=$radius'),
+      );
+      return jsonDecode(response.body);
+    } catch (e) {
+      return {'success': false, 'error': e.toString()};
+    }
+  }
+
   Future<Map<String, dynamic>> getNearbyPolice(double lat, double lng,
       {int radius = 10000}) async {
     try {